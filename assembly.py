@@ -0,0 +1,172 @@
+"""Assembly of records that span several lines into single logical records.
+
+Titles, compound descriptions, SEQRES sequences, CONECT bonds and sheets are
+written over consecutive lines, which a PDBReader yields as separate records.
+`assemble` is a streaming stage that merges each run of such lines as it goes:
+
+    with PDBReader("1.pdb") as pdb:
+        for record in assembly.assemble(pdb):
+            ...
+
+Only the current run of lines is buffered, so memory doesn't grow with the file.
+Other records pass through unchanged and in order.
+
+Runs are told apart by fields read from the full PDB columns of the lines, e.g. the
+SEQRES chain ID from column 12, which parsed records don't hold (see
+`record_reader.FieldReader.exact_columns`). The lines come from the PDBReader, or
+from lazy records.
+"""
+
+from collections import namedtuple
+
+import record_reader
+from pdb_reader import PDBReader
+
+# A chain's sequence from its SEQRES lines.
+Sequence = namedtuple("Sequence", ["chainid", "numres", "residues"])
+
+# The atoms bonded to an atom, from its CONECT lines.
+Bonds = namedtuple("Bonds", ["serial", "bonded"])
+
+# The strands of a sheet, from its SHEET lines.
+Strands = namedtuple("Strands", ["sheetid", "numstrands", "strands"])
+
+# Text field of the records whose continuation lines extend the text.
+TEXT_FIELDS = {
+    "Title": "title",
+    "Compnd": "compound",
+    "Source": "srcname",
+    "Caveat": "comment",
+}
+
+
+def _exact_fields(key):
+    """Returns the fields of a record type that read their full PDB columns."""
+    return [field.exact_columns() for field in record_reader.Readers[key].fields]
+
+
+def _read(fields, line):
+    return [field.read(line) for field in fields]
+
+
+def _text_rule(key, field):
+    continuation = next(f for f in _exact_fields(key) if f.name == "continuation")
+
+    def merge(group):
+        text = " ".join(getattr(record, field) for _, record in group)
+        return group[0][1]._replace(**{field: text})
+
+    return (lambda group, line: bool(continuation.read(line))), merge
+
+
+_SEQRES_FIELDS = _exact_fields("Seqres")
+
+
+def _seqres_continues(group, line):
+    _, chainid, numres, *_ = _read(_SEQRES_FIELDS[:3], group[0][0])
+    if _SEQRES_FIELDS[1].read(line) != chainid:
+        return False
+    # All lines of a chain but the last hold 13 residues.
+    last = _read(_SEQRES_FIELDS[3:], group[-1][0])
+    residues = 13 * (len(group) - 1) + sum(1 for name in last if name)
+    return not numres or residues < numres
+
+
+def _seqres_merge(group):
+    rows = [_read(_SEQRES_FIELDS, line) for line, _ in group]
+    residues = tuple(name for row in rows for name in row[3:] if name)
+    return Sequence(rows[0][1], rows[0][2], residues)
+
+
+_CONECT_FIELDS = _exact_fields("Conect")
+
+
+def _conect_continues(group, line):
+    serial = _CONECT_FIELDS[0]
+    return serial.read(line) == serial.read(group[0][0])
+
+
+def _conect_merge(group):
+    rows = [_read(_CONECT_FIELDS, line) for line, _ in group]
+    bonded = tuple(serial for row in rows for serial in row[1:] if serial)
+    return Bonds(rows[0][0], bonded)
+
+
+_SHEET_FIELDS = [
+    field for field in _exact_fields("Sheet") if field.name in ("sheetid", "numstrands")
+]
+
+
+def _sheet_continues(group, line):
+    sheetid, numstrands = _read(_SHEET_FIELDS, group[0][0])
+    if _SHEET_FIELDS[0].read(line) != sheetid:
+        return False
+    return not numstrands or len(group) < numstrands
+
+
+def _sheet_merge(group):
+    sheetid, numstrands = _read(_SHEET_FIELDS, group[0][0])
+    return Strands(sheetid, numstrands, tuple(record for _, record in group))
+
+
+# Record type to (continues, merge): continues(group, line) tells whether the line
+# extends the group of (line, record) pairs so far, and merge(group) returns the
+# logical record.
+RULES = {
+    **{key: _text_rule(key, field) for key, field in TEXT_FIELDS.items()},
+    "Seqres": (_seqres_continues, _seqres_merge),
+    "Conect": (_conect_continues, _conect_merge),
+    "Sheet": (_sheet_continues, _sheet_merge),
+}
+
+
+def assemble(records, record_types=tuple(RULES)):
+    """Yields records with each run of continued lines merged into one record.
+
+    Title, Compnd, Source and Caveat lines are merged into the first record, with
+    the text of all lines joined by spaces. SEQRES lines become a `Sequence` per
+    chain, CONECT lines a `Bonds` per atom, and SHEET lines a `Strands` per sheet.
+    HELIX records describe a whole helix on one line and pass through.
+
+    Args:
+      records: A PDBReader, or an iterable of lazy records. Parsed records without
+        their lines can only be given for record types that aren't assembled.
+      record_types: Keys of RULES of the records to assemble.
+
+    Raises:
+      ValueError: If a record to assemble has no line.
+    """
+    by_container = {record_reader.types[key]: RULES[key] for key in record_types}
+    rules = {}  # Memoized rule, or None, of every record class seen.
+    if isinstance(records, PDBReader):
+        items = records.lines_and_records()
+    else:
+        items = ((getattr(record, "_line", None), record) for record in records)
+
+    group = rule = None
+    for line, record in items:
+        cls = type(record)
+        try:
+            record_rule = rules[cls]
+        except KeyError:
+            record_rule = rules[cls] = by_container.get(getattr(cls, "_container", cls))
+
+        if group is not None:
+            if record_rule is rule and rule[0](group, line):
+                group.append((line, record))
+                continue
+            yield rule[1](group)
+            group = None
+
+        if record_rule is None:
+            yield record
+        elif line is None:
+            raise ValueError(
+                f"{cls.__name__} records are assembled from their lines; pass a "
+                "PDBReader or lazy records."
+            )
+        else:
+            group, rule = [(line, record)], record_rule
+
+    if group is not None:
+        yield rule[1](group)
@@ -0,0 +1,110 @@
+import io
+import os
+import unittest
+
+import assembly
+from pdb_reader import PDBReader
+
+EXAMPLE_PDB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "1.pdb")
+
+HEADER = """\
+TITLE     CRYSTAL STRUCTURE OF A
+TITLE    2 SMALL PROTEIN
+COMPND    MOL_ID: 1;
+COMPND   2 MOLECULE: LYSOZYME;
+SEQRES   1 A   15  ALA GLY SER THR VAL LEU ILE MET PHE TRP PRO CYS ASN
+SEQRES   2 A   15  GLN TYR
+SEQRES   1 B    2  ALA GLY
+SEQRES   1 C   13  ALA GLY SER THR VAL LEU ILE MET PHE TRP PRO CYS ASN
+SEQRES   1 D    1  HIS
+CONECT  413  412  414
+CONECT  413  415
+CONECT  414  413
+TITLE     A SECOND TITLE
+"""
+
+
+def read(text, **options):
+    with PDBReader(io.BytesIO(text.encode()), **options) as pdb:
+        return list(assembly.assemble(pdb))
+
+
+class TestAssemble(unittest.TestCase):
+    def test_header(self):
+        with PDBReader(io.BytesIO(HEADER.encode())) as pdb:
+            lines = list(pdb)
+        title, compound, a, b, c, d, bonds413, bonds414, second = read(HEADER)
+        self.assertEqual(title.title, f"{lines[0].title} SMALL PROTEIN")
+        self.assertEqual(title.continuation, "")
+        self.assertEqual(compound.compound, f"{lines[2].compound} MOLECULE: LYSOZYME;")
+        self.assertEqual([len(s.residues) for s in (a, b, c, d)], [15, 2, 13, 1])
+        self.assertEqual((a.numres, b.numres), (15, 2))
+        self.assertEqual(bonds413, assembly.Bonds(413, (412, 414, 415)))
+        self.assertEqual(bonds414, assembly.Bonds(414, (413,)))
+        self.assertEqual(second, lines[-1])
+
+    def test_lazy_records(self):
+        self.assertEqual(read(HEADER, lazy=True), read(HEADER))
+        with PDBReader(io.BytesIO(HEADER.encode()), lazy=True) as pdb:
+            self.assertEqual(list(assembly.assemble(iter(pdb))), read(HEADER))
+
+    def test_sequences_from_full_columns(self):
+        sequences = read(HEADER)[2:6]
+        self.assertEqual([s.chainid for s in sequences], ["A", "B", "C", "D"])
+        self.assertEqual(sequences[0].residues[:3], ("ALA", "GLY", "SER"))
+        self.assertEqual(sequences[3].residues, ("HIS",))
+
+    def test_long_chains(self):
+        def seqres(chain, count):
+            lines = []
+            for i in range(0, count, 13):
+                names = " ".join(["ALA"] * min(13, count - i))
+                lines.append(f"SEQRES {i // 13 + 1:3d} {chain} {count:4d}  {names}\n")
+            return "".join(lines)
+
+        for sizes in [(1000, 20), (1040, 1300), (1130, 5), (1234, 3)]:
+            text = seqres("A", sizes[0]) + seqres("B", sizes[1])
+            for lazy in (False, True):
+                with self.subTest(sizes=sizes, lazy=lazy):
+                    sequences = read(text, lazy=lazy)
+                    lengths = [len(s.residues) for s in sequences]
+                    self.assertEqual(lengths, list(sizes))
+                    self.assertEqual([s.chainid for s in sequences], ["A", "B"])
+                    self.assertEqual([s.numres for s in sequences], list(sizes))
+
+    def test_five_digit_conect_serials(self):
+        bonds = read("CONECT1041310412\nCONECT  413  412\n")
+        self.assertEqual(
+            bonds, [assembly.Bonds(10413, (10412,)), assembly.Bonds(413, (412,))]
+        )
+
+    def test_parsed_records_without_lines(self):
+        with PDBReader(io.BytesIO(HEADER.encode())) as pdb:
+            records = list(pdb)
+        with self.assertRaises(ValueError):
+            list(assembly.assemble(records))
+        assembled = list(assembly.assemble(records, record_types=("Sheet",)))
+        self.assertEqual(assembled, records)
+
+    def test_selected_types(self):
+        records = read(HEADER)
+        with PDBReader(io.BytesIO(HEADER.encode())) as pdb:
+            conect_only = list(assembly.assemble(pdb, record_types=("Conect",)))
+        self.assertEqual(len(conect_only), 12)
+        self.assertEqual(conect_only[-3:-1], records[-3:-1])
+
+    def test_sheets(self):
+        with PDBReader(EXAMPLE_PDB) as pdb:
+            records = list(pdb)
+            pdb.reset()
+            assembled = list(assembly.assemble(pdb))
+
+        strands = [r for r in assembled if isinstance(r, assembly.Strands)]
+        self.assertEqual([(s.sheetid, len(s.strands)) for s in strands], [("A", 5), ("B", 5)])
+        sheets = [r for r in records if type(r).__name__ == "Sheet"]
+        self.assertEqual([s for group in strands for s in group.strands], sheets)
+        self.assertEqual(len(assembled), len(records) - len(sheets) + 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,292 @@
+"""Parsing PDB files in parallel with a process pool.
+
+`parse_many` parses many files, one file per task. `parse_parallel` splits one large
+file into line-aligned byte ranges and parses the ranges as separate tasks.
+
+Each worker process builds its reader table once, from the module-level
+`record_reader.Readers`, and then parses files or byte ranges. Records are sent back
+as plain tuples tagged with their record name and rebuilt into the usual containers
+in the parent, since the generated namedtuple classes can't be pickled by reference.
+"""
+
+import collections
+import concurrent.futures
+import dataclasses
+import functools
+import mmap
+import os
+
+import record_reader
+from pdb_reader import PDBReader
+
+# Readers of the current worker process, set once by _init_worker.
+_worker_readers = None
+
+# Marks the end of the paths of submit_bounded.
+_NO_PATH = object()
+
+
+@dataclasses.dataclass
+class FileResult:
+    """The outcome of parsing one file.
+
+    Attributes:
+      path: Path of the file.
+      records: Parsed records, or None if parsing failed.
+      error: The exception that stopped parsing, or None on success.
+    """
+
+    path: str
+    records: list = None
+    error: Exception = None
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+def _init_worker(reader_names):
+    global _worker_readers
+    _worker_readers = tuple(record_reader.Readers[name] for name in reader_names)
+
+
+def _to_rows(records):
+    return [(type(record).__name__, tuple(record)) for record in records]
+
+
+def _containers(reader_names):
+    return {
+        record_reader.Readers[name].name: record_reader.Readers[name].container
+        for name in reader_names
+    }
+
+
+def _parse_file(path, use_mmap):
+    try:
+        with PDBReader(path, _worker_readers, use_mmap=use_mmap) as pdb:
+            return _to_rows(pdb), None
+    except Exception as e:
+        return None, e
+
+
+def _parse_range(path, start, end):
+    with PDBReader(path, _worker_readers, use_mmap=True) as pdb:
+        return _to_rows(pdb.read_range(start, end))
+
+
+def parse_many(
+    paths,
+    readers=tuple(record_reader.Readers),
+    workers=None,
+    ordered=True,
+    use_mmap=False,
+    max_pending=None,
+):
+    """Parses PDB files in worker processes and yields their results as they finish.
+
+    A file that fails to parse is reported through its FileResult and does not stop
+    the batch, even if it kills its worker process; see `submit_bounded`.
+
+    Args:
+      paths: Iterable of PDB file paths. It is consumed lazily.
+      readers: Keys of `record_reader.Readers` to parse; other records are skipped.
+      workers: Number of worker processes. Defaults to the number of CPUs.
+      ordered: If True, results are yielded in the order of paths, otherwise in the
+        order they complete.
+      use_mmap: Passed on to each PDBReader.
+      max_pending: Maximum number of files submitted but not yet yielded. Defaults
+        to four per worker.
+
+    Yields:
+      A FileResult per path.
+    """
+    reader_names = tuple(readers)
+    containers = _containers(reader_names)
+    workers = workers or os.cpu_count() or 1
+    max_pending = max_pending or 4 * workers
+
+    def to_result(path, future):
+        try:
+            rows, error = future.result()
+        except Exception as e:  # The worker died, e.g. BrokenProcessPool.
+            return FileResult(path, error=e)
+        if error is not None:
+            return FileResult(path, error=error)
+        return FileResult(path, [containers[name]._make(row) for name, row in rows])
+
+    new_pool = functools.partial(
+        concurrent.futures.ProcessPoolExecutor,
+        workers,
+        initializer=_init_worker,
+        initargs=(reader_names,),
+    )
+    tasks = submit_bounded(
+        new_pool, _parse_file, paths, (use_mmap,), ordered, max_pending
+    )
+    for path, future in tasks:
+        yield to_result(path, future)
+
+
+def _crashed(future):
+    return not future.cancelled() and isinstance(
+        future.exception(), concurrent.futures.BrokenExecutor
+    )
+
+
+def submit_bounded(new_pool, function, paths, args=(), ordered=True, max_pending=1):
+    """Submits `function(path, *args)` for each path and yields finished tasks.
+
+    Paths are consumed lazily and at most max_pending tasks are submitted but not
+    yet yielded, so neither the paths nor the results of a long batch pile up.
+
+    A worker process that dies, e.g. by a crash in an extension module or by the
+    OOM killer, breaks its pool, and every task pending in the pool fails. The
+    pool is then replaced and those tasks are run again one at a time, so only the
+    task that kills its worker when it runs alone fails, with `BrokenProcessPool`,
+    and the batch goes on.
+
+    Args:
+      new_pool: Function that returns a new `concurrent.futures` executor. It is
+        called again to replace a broken pool.
+      function: Function to call with each path and args.
+      paths: Iterable of paths.
+      args: Further arguments of function.
+      ordered: If True, tasks are yielded in the order of paths, otherwise in the
+        order they complete.
+      max_pending: Maximum number of tasks submitted but not yet yielded.
+
+    Yields:
+      (path, future) of each finished task.
+    """
+    paths = iter(paths)
+    pending = collections.OrderedDict()
+    rerun = collections.deque()  # Paths to run one at a time after a crash.
+    pool = new_pool()
+
+    def submit():
+        """Fills the pool with tasks. Returns False if the pool is broken."""
+        limit = 1 if rerun else max_pending
+        while len(pending) < limit:
+            if rerun:
+                path = rerun.popleft()
+            else:
+                path = next(paths, _NO_PATH)
+                if path is _NO_PATH:
+                    break
+            try:
+                pending[pool.submit(function, path, *args)] = path
+            except RuntimeError:  # BrokenProcessPool, from a crash not seen yet.
+                rerun.appendleft(path)
+                return False
+        return True
+
+    def replace_pool(rerun_pending):
+        nonlocal pool
+        pool.shutdown(cancel_futures=True)
+        pool = new_pool()
+        if rerun_pending:
+            rerun.extendleft(reversed(pending.values()))
+            pending.clear()
+
+    try:
+        if not submit():
+            replace_pool(rerun_pending=True)
+        while pending or rerun:
+            if not pending:
+                if not submit():
+                    replace_pool(rerun_pending=True)
+                continue
+
+            if ordered:
+                done = [next(iter(pending))]
+                concurrent.futures.wait(done)
+            else:
+                finished, _ = concurrent.futures.wait(
+                    pending, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                done = [future for future in pending if future in finished]
+
+            if any(_crashed(future) for future in done):
+                # A task that ran alone is the one that killed its worker and is
+                # yielded as failed; otherwise any pending task may be to blame.
+                alone = len(pending) == 1
+                replace_pool(rerun_pending=not alone)
+                if not alone:
+                    continue
+
+            finished = [(pending.pop(future), future) for future in done]
+            if not submit():
+                replace_pool(rerun_pending=True)
+            for path, future in finished:
+                yield path, future
+    finally:
+        pool.shutdown(cancel_futures=True)
+
+
+def split_ranges(path, parts, align_models=True):
+    """Splits a file into about `parts` byte ranges that start at line starts.
+
+    Args:
+      path: Path of the file.
+      parts: Number of ranges to aim for.
+      align_models: If True, a range boundary is moved forward to the next MODEL
+        record when there is one within half a range, so models aren't split.
+
+    Returns:
+      List of (start, end) byte offsets covering the whole file.
+    """
+    size = os.path.getsize(path)
+    if not size:
+        return []
+
+    step = -(-size // max(parts, 1))
+    boundaries = [0]
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for offset in range(step, size, step):
+            # Searching from offset - 1 finds offset itself when it starts a line.
+            boundary = mm.find(b"\n", offset - 1) + 1
+            if align_models:
+                model = mm.find(b"\nMODEL", offset - 1, offset + step // 2)
+                if model >= 0:
+                    boundary = model + 1
+            if boundaries[-1] < boundary < size:
+                boundaries.append(boundary)
+
+    boundaries.append(size)
+    return list(zip(boundaries, boundaries[1:]))
+
+
+def parse_parallel(
+    path,
+    readers=tuple(record_reader.Readers),
+    workers=None,
+    parts=None,
+    align_models=True,
+):
+    """Parses a single file in worker processes, split into byte ranges.
+
+    Ranges are parsed independently and their records are yielded in file order, as
+    iterating over a PDBReader would.
+
+    Args:
+      path: Path of an uncompressed PDB file.
+      readers: Keys of `record_reader.Readers` to parse; other records are skipped.
+      workers: Number of worker processes. Defaults to the number of CPUs.
+      parts: Number of ranges to split the file into. Defaults to four per worker.
+      align_models: Passed on to `split_ranges`.
+
+    Yields:
+      The parsed records.
+    """
+    reader_names = tuple(readers)
+    containers = _containers(reader_names)
+    workers = workers or os.cpu_count() or 1
+    ranges = split_ranges(path, parts or 4 * workers, align_models)
+
+    with concurrent.futures.ProcessPoolExecutor(
+        workers, initializer=_init_worker, initargs=(reader_names,)
+    ) as pool:
+        futures = [pool.submit(_parse_range, path, start, end) for start, end in ranges]
+        for future in futures:
+            for name, row in future.result():
+                yield containers[name]._make(row)
@@ -0,0 +1,110 @@
+import concurrent.futures
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import batch
+import record_reader
+from batch import parse_many, parse_parallel, split_ranges
+from pdb_reader import PDBReader
+
+EXAMPLE_PDB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "1.pdb")
+
+_parse_file = batch._parse_file
+
+
+def _crash_on_marked_paths(path, use_mmap):
+    """Parses path like batch._parse_file, but kills the worker for "crash" paths."""
+    if "crash" in os.path.basename(path):
+        os._exit(1)
+    return _parse_file(path, use_mmap)
+
+
+class TestParseMany(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.missing = os.path.join(self.tmp.name, "missing.pdb")
+        self.paths = [EXAMPLE_PDB, self.missing, EXAMPLE_PDB, EXAMPLE_PDB]
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_ordered_results(self):
+        with PDBReader(EXAMPLE_PDB) as pdb:
+            expected = list(pdb)
+
+        results = list(parse_many(self.paths, workers=2, max_pending=2))
+
+        self.assertEqual([r.path for r in results], self.paths)
+        self.assertEqual(results[0].records, expected)
+        self.assertIsInstance(results[0].records[1], record_reader.types["Cryst1"])
+        self.assertFalse(results[1].ok)
+        self.assertIsInstance(results[1].error, FileNotFoundError)
+        self.assertTrue(all(r.ok for r in results[2:]))
+
+    def test_unordered_selected_readers(self):
+        results = list(parse_many(self.paths, readers=["Atom"], workers=2, ordered=False))
+
+        self.assertEqual(sorted(r.path for r in results), sorted(self.paths))
+        for result in results:
+            if result.ok:
+                self.assertEqual(len(result.records), 8)
+                self.assertEqual({type(r).__name__ for r in result.records}, {"Atom"})
+
+    def test_worker_crash(self):
+        crash = os.path.join(self.tmp.name, "crash.pdb")
+        paths = [EXAMPLE_PDB, crash, EXAMPLE_PDB, crash, EXAMPLE_PDB]
+        with mock.patch.object(batch, "_parse_file", _crash_on_marked_paths):
+            for workers, max_pending in ((1, 1), (2, 4)):
+                results = list(
+                    parse_many(paths, ["Atom"], workers=workers, max_pending=max_pending)
+                )
+
+                self.assertEqual([r.path for r in results], paths)
+                self.assertEqual([r.ok for r in results], [True, False] * 2 + [True])
+                for result in results[1:4:2]:
+                    self.assertIsInstance(
+                        result.error, concurrent.futures.process.BrokenProcessPool
+                    )
+                self.assertEqual([len(r.records) for r in results[::2]], [8] * 3)
+
+    def test_worker_crash_unordered(self):
+        crash = os.path.join(self.tmp.name, "crash.pdb")
+        paths = [crash, EXAMPLE_PDB, EXAMPLE_PDB, EXAMPLE_PDB]
+        with mock.patch.object(batch, "_parse_file", _crash_on_marked_paths):
+            results = list(parse_many(paths, ["Atom"], workers=2, ordered=False))
+
+        self.assertEqual(sorted(r.path for r in results), sorted(paths))
+        self.assertEqual([r.path for r in results if not r.ok], [crash])
+
+
+class TestParseParallel(unittest.TestCase):
+    def test_split_ranges_line_aligned(self):
+        with open(EXAMPLE_PDB, "rb") as f:
+            data = f.read()
+
+        ranges = split_ranges(EXAMPLE_PDB, 5, align_models=False)
+
+        self.assertEqual(ranges[0][0], 0)
+        self.assertEqual(ranges[-1][1], len(data))
+        for (_, end), (start, _) in zip(ranges, ranges[1:]):
+            self.assertEqual(end, start)
+            self.assertEqual(data[start - 1 : start], b"\n")
+
+    def test_split_ranges_model_aligned(self):
+        with open(EXAMPLE_PDB, "rb") as f:
+            data = f.read()
+        second_model = data.index(b"MODEL        2")
+
+        self.assertEqual(split_ranges(EXAMPLE_PDB, 3)[0], (0, second_model))
+
+    def test_same_records_as_reader(self):
+        with PDBReader(EXAMPLE_PDB) as pdb:
+            expected = list(pdb)
+
+        self.assertEqual(list(parse_parallel(EXAMPLE_PDB, workers=2, parts=7)), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,214 @@
+"""Parser throughput benchmarks on synthetic PDB files.
+
+Synthetic files are generated from the field layouts of `record_reader.Readers`, so
+every generated line is parseable by the readers, with a configurable record mix.
+Each run measures lines and megabytes per second of a full PDBReader pass, peak
+memory of keeping all records, and parse time per record type. Results are written
+as JSON and can be compared with an earlier run to catch regressions:
+
+    python benchmark.py --lines 200000 --output new.json --baseline old.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import string
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import record_reader
+from pdb_reader import PDBReader
+
+# Relative weights of record types (keys of record_reader.Readers) in each mix.
+MIXES = {
+    "atom": {"Atom": 9, "Hetatm": 1},
+    "models": {"Atom": 1},  # Atoms framed by MODEL/ENDMDL, see `generate`.
+    "anisou": {"Atom": 1, "Anisou": 1, "Siguij": 1},
+    "conect": {"Atom": 3, "Conect": 7},
+    "all": {key: 1 for key in record_reader.Readers},
+}
+
+ATOMS_PER_MODEL = 1000
+
+
+def _field_value(field, rng):
+    width = field.end - field.start
+    if field.dtype is int:
+        return str(rng.randrange(10 ** min(width - 1, 6))).rjust(width)
+    if field.dtype is float:
+        decimals = min(3, max(width - 3, 0))
+        number = rng.uniform(-1, 1) * 10 ** (width - decimals - 2)
+        return f"{number:{width}.{decimals}f}"[:width]
+    return "".join(rng.choice(string.ascii_uppercase) for _ in range(width))
+
+
+def make_line(reader, rng):
+    """Returns a random line that reader parses."""
+    line = list(reader.name.upper().ljust(80))
+    for field in reader.fields:
+        if field.end > field.start:
+            line[field.start : field.end] = _field_value(field, rng)
+    return "".join(line).rstrip() + "\n"
+
+
+def generate(mix, lines, seed=0):
+    """Yields about `lines` random lines with the record mix named mix."""
+    rng = random.Random(seed)
+    keys, weights = zip(*MIXES[mix].items())
+    readers = [record_reader.Readers[key] for key in keys]
+
+    for i in range(lines):
+        if mix == "models" and i % ATOMS_PER_MODEL == 0:
+            if i:
+                yield "ENDMDL\n"
+            yield f"{'MODEL':<10}{i // ATOMS_PER_MODEL + 1:>4}\n"
+        yield make_line(rng.choices(readers, weights)[0], rng)
+    if mix == "models":
+        yield "ENDMDL\n"
+
+
+def write_file(path, mix, lines, seed=0):
+    with open(path, "w") as f:
+        f.writelines(generate(mix, lines, seed))
+
+
+def _time(function, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _count_records(path, **reader_options):
+    with PDBReader(path, **reader_options) as pdb:
+        return sum(1 for _ in pdb)
+
+
+def _per_record_type(path, repeat):
+    index = record_reader.RecordIndex(record_reader.Readers.values())
+    by_reader = {}
+    with open(path) as f:
+        for line in f:
+            reader = index.reader_for(line)
+            if reader is not None:
+                by_reader.setdefault(reader, []).append(line)
+
+    results = {}
+    for reader, lines in by_reader.items():
+        parse = reader.parse
+        seconds = _time(lambda: [parse(line) for line in lines], repeat)
+        results[reader.name] = {
+            "lines": len(lines),
+            "seconds": seconds,
+            "lines_per_sec": len(lines) / seconds if seconds else None,
+        }
+    return results
+
+
+def _peak_memory(path):
+    tracemalloc.start()
+    try:
+        with PDBReader(path) as pdb:
+            records = list(pdb)
+        return tracemalloc.get_traced_memory()[1], len(records)
+    finally:
+        tracemalloc.stop()
+
+
+def run(mix, lines, repeat=3, seed=0, directory=None):
+    """Benchmarks PDBReader on a generated file and returns the measurements."""
+    with tempfile.TemporaryDirectory(dir=directory) as tmp:
+        path = os.path.join(tmp, f"{mix}.pdb")
+        write_file(path, mix, lines, seed)
+        size = os.path.getsize(path)
+        with open(path) as f:
+            line_count = sum(1 for _ in f)
+
+        results = {"lines": line_count, "bytes": size}
+        for mode, options in (("text", {}), ("mmap", {"use_mmap": True})):
+            seconds = _time(lambda: _count_records(path, **options), repeat)
+            results[mode] = {
+                "seconds": seconds,
+                "lines_per_sec": line_count / seconds,
+                "mb_per_sec": size / seconds / 1e6,
+            }
+        results["peak_memory_bytes"], results["records"] = _peak_memory(path)
+        results["record_types"] = _per_record_type(path, repeat)
+    return results
+
+
+def compare(current, baseline, tolerance=0.1):
+    """Lists throughputs of current that are more than tolerance below baseline.
+
+    Args:
+      current: Results of `main`, as loaded from JSON.
+      baseline: Earlier results to compare with.
+      tolerance: Allowed relative slowdown.
+
+    Returns:
+      List of (name, baseline lines/sec, current lines/sec) of the regressions.
+    """
+
+    def throughputs(results):
+        for mix, result in results["mixes"].items():
+            for mode in ("text", "mmap"):
+                yield f"{mix}/{mode}", result[mode]["lines_per_sec"]
+            for name, timing in result["record_types"].items():
+                yield f"{mix}/{name}", timing["lines_per_sec"]
+
+    old = dict(throughputs(baseline))
+    regressions = []
+    for name, new in throughputs(current):
+        if old.get(name) and new and new < old[name] * (1 - tolerance):
+            regressions.append((name, old[name], new))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mix", nargs="+", choices=sorted(MIXES), default=sorted(MIXES))
+    parser.add_argument("--lines", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="JSON file to write the results to.")
+    parser.add_argument("--baseline", help="JSON results to compare with.")
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    args = parser.parse_args(argv)
+
+    results = {
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "lines": args.lines,
+        "mixes": {},
+    }
+    for mix in args.mix:
+        result = results["mixes"][mix] = run(mix, args.lines, args.repeat, args.seed)
+        print(
+            f"{mix:>8}: {result['text']['lines_per_sec']:>10.0f} lines/s "
+            f"{result['text']['mb_per_sec']:>6.1f} MB/s (mmap "
+            f"{result['mmap']['lines_per_sec']:.0f} lines/s), peak "
+            f"{result['peak_memory_bytes'] / 1e6:.1f} MB"
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for name, old, new in regressions:
+            print(f"Regression in {name}: {old:.0f} -> {new:.0f} lines/s")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,49 @@
+import copy
+import random
+import unittest
+
+import benchmark
+import record_reader
+
+
+class TestGenerate(unittest.TestCase):
+    def test_lines_parse_as_their_record_type(self):
+        index = record_reader.RecordIndex(record_reader.Readers.values())
+        for key, reader in record_reader.Readers.items():
+            line = benchmark.make_line(reader, random.Random(key))
+            self.assertIs(index.reader_for(line), reader, key)
+            self.assertIsInstance(reader.parse(line), reader.container)
+
+    def test_mixes(self):
+        for mix in benchmark.MIXES:
+            lines = list(benchmark.generate(mix, 50))
+            self.assertGreaterEqual(len(lines), 50, mix)
+            self.assertEqual(lines, list(benchmark.generate(mix, 50)))
+
+    def test_models_mix_frames_atoms(self):
+        lines = list(benchmark.generate("models", 2 * benchmark.ATOMS_PER_MODEL))
+        models = [line for line in lines if line.startswith("MODEL")]
+        self.assertEqual(len(models), 2)
+        self.assertEqual(record_reader.Readers["Model"].parse(models[1]).serial, 2)
+        self.assertEqual(sum(line.startswith("ENDMDL") for line in lines), 2)
+
+
+class TestRunAndCompare(unittest.TestCase):
+    def test_run_and_compare(self):
+        result = benchmark.run("conect", 200, repeat=1)
+        self.assertEqual(result["lines"], 200)
+        self.assertGreater(result["peak_memory_bytes"], 0)
+        self.assertEqual(set(result["record_types"]), {"Atom", "Conect"})
+
+        baseline = {"mixes": {"conect": result}}
+        current = copy.deepcopy(baseline)
+        self.assertEqual(benchmark.compare(current, baseline), [])
+
+        current["mixes"]["conect"]["text"]["lines_per_sec"] /= 2
+        self.assertEqual(
+            [name for name, _, _ in benchmark.compare(current, baseline)], ["conect/text"]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
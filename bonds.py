@@ -0,0 +1,159 @@
+"""Bond graphs from CONECT records in compressed sparse row (CSR) form.
+
+Atoms are numbered by their position among the ATOM and HETATM records of the file,
+and the neighbors of atom i are `indices[offsets[i]:offsets[i + 1]]`, so looking up
+the bonds of an atom is two array reads however many bonds the file has:
+
+    with PDBReader("ligand.pdb") as pdb:
+        graph = pdb.to_bond_graph()
+    print(graph.serials[graph.neighbors(graph.index_of(413))])
+"""
+
+import numpy as np
+
+import columnar
+import record_reader
+
+# Columns of the bonded atoms of a CONECT record.
+BONDED_FIELDS = ("serial1", "serial2", "serial3", "serial4")
+
+
+class BondGraph:
+    """Bonds between atoms as CSR adjacency arrays.
+
+    Attributes:
+      serials: Serial number of each atom, in file order.
+      offsets: Start of the neighbors of each atom in indices, followed by the
+        number of bonds; atom i has neighbors `indices[offsets[i]:offsets[i + 1]]`.
+      indices: Atom indices of the neighbors, sorted for each atom.
+      symmetric: Whether every bond is stored in both directions.
+      missing: Number of bonds dropped because an atom serial had no atom.
+    """
+
+    def __init__(self, serials, offsets, indices, symmetric=True, missing=0):
+        self.serials = np.asarray(serials, np.int64)
+        self.offsets = offsets
+        self.indices = indices
+        self.symmetric = symmetric
+        self.missing = missing
+        # Serial numbers take columns 7-11, so they have at most five digits and a
+        # dense lookup array has at most 100000 entries. The first atom of a serial
+        # wins, which is the atom in the first model of files whose models repeat
+        # serials.
+        valid = np.flatnonzero(self.serials >= 0)
+        unique, first = np.unique(self.serials[valid], return_index=True)
+        self._lookup = np.full(int(unique[-1]) + 1 if len(unique) else 0, -1, np.int64)
+        self._lookup[unique] = valid[first]
+
+    @classmethod
+    def from_bonds(cls, serials, bonded_from, bonded_to, symmetric=True):
+        """Creates the graph of the atoms with serials and bonds between serials.
+
+        Args:
+          serials: Serial number of each atom.
+          bonded_from, bonded_to: Serials of the two atoms of each bond. Zeros, as
+            read from blank CONECT columns, are ignored.
+          symmetric: If True, every bond is added in both directions, whether the
+            file lists it once or twice.
+        """
+        count = len(serials)
+        empty = np.zeros(0, np.int64)
+        graph = cls(serials, np.zeros(count + 1, np.int64), empty, symmetric)
+
+        bonded_from = np.asarray(bonded_from, np.int64)
+        bonded_to = np.asarray(bonded_to, np.int64)
+        listed = (bonded_from != 0) & (bonded_to != 0)
+        source = graph.index_of(bonded_from[listed])
+        target = graph.index_of(bonded_to[listed])
+        known = (source >= 0) & (target >= 0)
+        source, target = source[known], target[known]
+        if symmetric:
+            source, target = (
+                np.concatenate([source, target]),
+                np.concatenate([target, source]),
+            )
+
+        # Sorting by a combined key also removes bonds listed more than once.
+        source, target = np.divmod(np.unique(source * count + target), max(count, 1))
+        np.cumsum(np.bincount(source, minlength=count), out=graph.offsets[1:])
+        graph.indices = target
+        graph.missing = int(np.count_nonzero(~known))
+        return graph
+
+    @classmethod
+    def build(cls, lines, symmetric=True):
+        """Builds the graph of the ATOM, HETATM and CONECT records of lines.
+
+        Serials are read from their full PDB columns, see
+        `record_reader.FieldReader.exact_columns`, so serials of five digits keep
+        their leading digit.
+
+        Args:
+          lines: Iterable of PDB lines, as str or bytes.
+          symmetric: Whether to add every bond in both directions.
+        """
+        readers = record_reader.Readers
+        conect = readers["Conect"]
+        serial_fields = {
+            reader: next(f for f in reader.fields if f.name == "serial")
+            for reader in (readers["Atom"], readers["Hetatm"])
+        }
+        index = record_reader.RecordIndex([conect, *serial_fields])
+
+        atom_lines, conect_lines = [], []
+        for line in lines:
+            reader = index.reader_for(line)
+            if reader is None:
+                continue
+            if isinstance(line, bytes):
+                line = line.decode()
+            (conect_lines if reader is conect else atom_lines).append(line)
+
+        serial_field = serial_fields[readers["Atom"]].exact_columns()
+        atom_block = columnar.line_block(atom_lines, serial_field.end)
+        serials = columnar.convert_column(serial_field, atom_lines, atom_block)
+        fields = {field.name: field.exact_columns() for field in conect.fields}
+        conect_block = columnar.line_block(conect_lines, max(f.end for f in conect.fields))
+        bonded_from = columnar.convert_column(fields["serial"], conect_lines, conect_block)
+        bonded_to = [
+            columnar.convert_column(fields[name], conect_lines, conect_block)
+            for name in BONDED_FIELDS
+        ]
+        return cls.from_bonds(
+            serials,
+            np.tile(np.asarray(bonded_from, np.int64), len(BONDED_FIELDS)),
+            np.concatenate(bonded_to) if conect_lines else [],
+            symmetric,
+        )
+
+    def __len__(self):
+        return len(self.serials)
+
+    @property
+    def bond_count(self):
+        """Number of entries in indices; each bond counts twice if symmetric."""
+        return len(self.indices)
+
+    def index_of(self, serials):
+        """Returns the atom index of serials, or -1 for serials without an atom."""
+        serials = np.asarray(serials, np.int64)
+        inside = (serials >= 0) & (serials < len(self._lookup))
+        result = np.full(serials.shape, -1, np.int64)
+        result[inside] = self._lookup[serials[inside]]
+        return result if result.ndim else int(result)
+
+    def neighbors(self, atom):
+        """Returns the atom indices bonded to the atom with index atom."""
+        return self.indices[self.offsets[atom] : self.offsets[atom + 1]]
+
+    def degrees(self):
+        """Returns the number of neighbors of each atom."""
+        return np.diff(self.offsets)
+
+    def pairs(self):
+        """Returns (i, j) arrays of the bonds, once each with i < j if symmetric."""
+        source = np.repeat(np.arange(len(self)), self.degrees())
+        if not self.symmetric:
+            return source, self.indices
+        keep = source < self.indices
+        return source[keep], self.indices[keep]
@@ -0,0 +1,95 @@
+import io
+import unittest
+
+import numpy as np
+
+import benchmark
+from pdb_reader import PDBReader
+
+LIGAND = """\
+HETATM  10  C1  LIG A   1       0.000   0.000   0.000  1.00  0.00           C
+HETATM  11  C2  LIG A   1       1.500   0.000   0.000  1.00  0.00           C
+HETATM  12  O1  LIG A   1       2.000   1.200   0.000  1.00  0.00           O
+HETATM  14  N1  LIG A   1       2.200  -1.200   0.000  1.00  0.00           N
+CONECT   10   11
+CONECT   11   10   12   14
+CONECT   12   11
+CONECT   14   11   99
+CONECT   12   14
+"""
+
+
+def read_graph(text, **options):
+    with PDBReader(io.BytesIO(text.encode())) as pdb:
+        return pdb.to_bond_graph(**options)
+
+
+class TestBondGraph(unittest.TestCase):
+    def test_ligand(self):
+        graph = read_graph(LIGAND)
+        self.assertEqual(graph.serials.tolist(), [10, 11, 12, 14])
+        self.assertEqual(graph.index_of(14), 3)
+        self.assertEqual(graph.index_of([11, 13, 99]).tolist(), [1, -1, -1])
+        self.assertEqual(graph.neighbors(1).tolist(), [0, 2, 3])
+        self.assertEqual(graph.neighbors(2).tolist(), [1, 3])
+        self.assertEqual(graph.degrees().tolist(), [1, 3, 2, 2])
+        self.assertEqual(graph.missing, 1)
+        i, j = graph.pairs()
+        pairs = list(zip(i.tolist(), j.tolist()))
+        self.assertEqual(pairs, [(0, 1), (1, 2), (1, 3), (2, 3)])
+
+    def test_directed(self):
+        graph = read_graph(LIGAND, symmetric=False)
+        self.assertEqual(graph.neighbors(3).tolist(), [1])
+        self.assertEqual(graph.neighbors(2).tolist(), [1, 3])
+        self.assertEqual(graph.bond_count, 7)
+
+    def test_same_as_records(self):
+        lines = list(benchmark.generate("conect", 3000, seed=5))
+        with PDBReader(io.BytesIO("".join(lines).encode())) as pdb:
+            records = list(pdb)
+            graph = pdb.to_bond_graph()
+
+        serials = [r.serial for r in records if type(r).__name__ == "Atom"]
+        index = {}
+        for i, serial in enumerate(serials):
+            index.setdefault(serial, i)
+
+        expected = set()
+        for record in records:
+            if type(record).__name__ != "Conect" or not record.serial:
+                continue
+            if record.serial in index:
+                for other in record[1:]:
+                    if other and other in index:
+                        a, b = index[record.serial], index[other]
+                        expected |= {(a, b), (b, a)}
+        actual = {
+            (atom, int(other))
+            for atom in range(len(graph))
+            for other in graph.neighbors(atom)
+        }
+        self.assertEqual(actual, expected)
+        self.assertTrue(np.all(np.diff(graph.offsets) >= 0))
+
+    def test_five_digit_serials(self):
+        atom = "ATOM  {:5d}  C   LIG A   1       0.000   0.000   0.000  1.00  0.00\n"
+        serials = [9999, 10001, 10002, 20001, 20002]
+        text = "".join(atom.format(serial) for serial in serials)
+        text += "CONECT10001 9999\nCONECT20001200021000210001\n"
+        graph = read_graph(text)
+        self.assertEqual(graph.serials.tolist(), serials)
+        self.assertEqual(graph.index_of([20002, 1, 2]).tolist(), [4, -1, -1])
+        self.assertEqual(graph.neighbors(3).tolist(), [1, 2, 4])
+        self.assertEqual(graph.neighbors(0).tolist(), [1])
+        self.assertEqual(graph.missing, 0)
+
+    def test_no_atoms(self):
+        graph = read_graph("CONECT    1    2\n")
+        self.assertEqual(len(graph), 0)
+        self.assertEqual(graph.offsets.tolist(), [0])
+        self.assertEqual(graph.missing, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,218 @@
+"""On-disk cache of parsed PDB files.
+
+A cache entry holds every record of a file parsed with all of `record_reader.Readers`.
+ATOM/HETATM records are stored as one `.npy` array per field, which are memory-mapped
+when the entry is loaded; the other records are stored as pickled rows. Entries are
+keyed by the file (its content, or its path, size and mtime) and a fingerprint of
+the specs, so editing `specs.ALL_SPECS` invalidates them.
+
+    cache = ParseCache("/tmp/pdb-cache", max_bytes=2**30)
+    with PDBReader("1.pdb", cache=cache) as pdb:
+        records = list(pdb)
+"""
+
+import hashlib
+import os
+import pickle
+import shutil
+import tempfile
+
+import numpy as np
+
+import columnar
+import record_reader
+from pdb_reader import PDBReader
+
+# Bump when the layout of cache entries changes.
+FORMAT_VERSION = 1
+
+COORDINATE_RECORDS = ("Atom", "Hetatm")
+
+
+def coordinate_fields():
+    return columnar.shared_fields(
+        [record_reader.Readers[key] for key in COORDINATE_RECORDS]
+    )
+
+
+def spec_fingerprint():
+    """Returns a hash of the field layout of all readers and the cache format."""
+    layout = [FORMAT_VERSION]
+    for key, reader in record_reader.Readers.items():
+        fields = [(f.name, f.start, f.end, f.dtype.__name__) for f in reader.fields]
+        layout.append((key, reader.name, fields))
+    return hashlib.sha256(repr(layout).encode()).hexdigest()[:16]
+
+
+class CacheEntry:
+    """The parsed records of one file, as loaded from the cache.
+
+    Attributes:
+      arrays: Dict of column arrays of the coordinate records, like
+        `columnar.read_arrays` returns.
+      rows: List of (record name, values) of the other records.
+      order: Boolean array with one entry per record, True for coordinate records.
+    """
+
+    def __init__(self, arrays, rows, order):
+        self.arrays = arrays
+        self.rows = rows
+        self.order = order
+
+    @classmethod
+    def from_records(cls, records):
+        coordinates = [r for r in records if type(r).__name__ in COORDINATE_RECORDS]
+        arrays = {"record": np.array([type(r).__name__ for r in coordinates], "U6")}
+        for i, field in enumerate(coordinate_fields()):
+            values = [r[i] for r in coordinates]
+            arrays[field.name] = np.array(values, columnar.column_dtype(field))
+
+        rows = [
+            (type(r).__name__, tuple(r))
+            for r in records
+            if type(r).__name__ not in COORDINATE_RECORDS
+        ]
+        order = np.array(
+            [type(r).__name__ in COORDINATE_RECORDS for r in records], bool
+        )
+        return cls(arrays, rows, order)
+
+    def save(self, directory):
+        for name, array in self.arrays.items():
+            np.save(os.path.join(directory, f"{name}.npy"), array)
+        np.save(os.path.join(directory, "_order.npy"), self.order)
+        with open(os.path.join(directory, "_rows.pkl"), "wb") as f:
+            pickle.dump(self.rows, f, pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, directory):
+        arrays = {}
+        for filename in os.listdir(directory):
+            name, ext = os.path.splitext(filename)
+            if ext == ".npy" and not name.startswith("_"):
+                arrays[name] = np.load(os.path.join(directory, filename), mmap_mode="r")
+        order = np.load(os.path.join(directory, "_order.npy"))
+        with open(os.path.join(directory, "_rows.pkl"), "rb") as f:
+            rows = pickle.load(f)
+        return cls(arrays, rows, order)
+
+    def select(self, record_types, fields=None):
+        """Returns the coordinate columns of some record types, like `to_arrays`.
+
+        When all rows are selected the arrays are the memory-mapped ones.
+        """
+        names = [record_reader.Readers[key].name for key in record_types]
+        fields = ["record"] + (fields or [field.name for field in coordinate_fields()])
+        rows = np.isin(self.arrays["record"], names)
+        if rows.all():
+            return {name: self.arrays[name] for name in fields}
+        return {name: np.asarray(self.arrays[name][rows]) for name in fields}
+
+    def records(self, names=None):
+        """Yields the records in file order, optionally only those named in names."""
+        containers = {r.name: r.container for r in record_reader.Readers.values()}
+        columns = [self.arrays[field.name].tolist() for field in coordinate_fields()]
+        coordinates = zip(self.arrays["record"].tolist(), zip(*columns))
+        rows = iter(self.rows)
+        for is_coordinate in self.order.tolist():
+            name, values = next(coordinates if is_coordinate else rows)
+            if names is None or name in names:
+                yield containers[name]._make(values)
+
+
+class ParseCache:
+    """A size-bounded directory of CacheEntries with least-recently-used eviction.
+
+    Attributes:
+      directory: Cache directory. If None, entries are kept in a `.pdbcache`
+        directory next to each source file.
+      max_bytes: Total size the directory is trimmed to after each store, evicting
+        the least recently used entries first. None means unbounded.
+      by_content: If True, files are keyed by a hash of their content, otherwise by
+        their absolute path, size and modification time.
+    """
+
+    def __init__(self, directory=None, max_bytes=None, by_content=False):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.by_content = by_content
+
+    def _directory_for(self, path):
+        if self.directory is not None:
+            return self.directory
+        return os.path.join(os.path.dirname(os.path.abspath(path)), ".pdbcache")
+
+    def key(self, path):
+        digest = hashlib.sha256(spec_fingerprint().encode())
+        if self.by_content:
+            with open(path, "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(block)
+        else:
+            stat = os.stat(path)
+            digest.update(
+                f"{os.path.abspath(path)}\0{stat.st_size}\0{stat.st_mtime_ns}".encode()
+            )
+        return digest.hexdigest()[:32]
+
+    def load(self, path):
+        """Returns the CacheEntry of path, or None on a cache miss."""
+        entry_dir = os.path.join(self._directory_for(path), self.key(path))
+        try:
+            entry = CacheEntry.load(entry_dir)
+        except (OSError, ValueError, pickle.UnpicklingError, EOFError):
+            return None
+        os.utime(entry_dir)  # Marks the entry as recently used.
+        return entry
+
+    def store(self, path, entry):
+        """Stores entry as the parsed records of path and returns it.
+
+        If the cache directory can't be written, e.g. the `.pdbcache` directory next
+        to a file in a read-only archive, the entry is returned without storing it.
+        """
+        directory = self._directory_for(path)
+        key = self.key(path)
+        try:
+            os.makedirs(directory, exist_ok=True)
+            tmp = tempfile.mkdtemp(prefix=".tmp-", dir=directory)
+        except OSError:
+            return entry
+        try:
+            entry.save(tmp)
+            os.replace(tmp, os.path.join(directory, key))
+        except OSError:
+            # Another process stored the same entry first.
+            shutil.rmtree(tmp, ignore_errors=True)
+        self.evict(directory, keep=key)
+        return entry
+
+    def get(self, path, use_mmap=False):
+        """Returns the CacheEntry of path, parsing and storing it on a cache miss."""
+        entry = self.load(path)
+        if entry is None:
+            readers = tuple(record_reader.Readers.values())
+            with PDBReader(path, readers, use_mmap=use_mmap) as pdb:
+                entry = self.store(path, CacheEntry.from_records(list(pdb)))
+        return entry
+
+    def evict(self, directory, keep=None):
+        """Removes least recently used entries until directory fits in max_bytes."""
+        if self.max_bytes is None:
+            return
+
+        entries = []
+        for name in os.listdir(directory):
+            entry_dir = os.path.join(directory, name)
+            if name.startswith(".") or not os.path.isdir(entry_dir):
+                continue
+            size = sum(entry.stat().st_size for entry in os.scandir(entry_dir))
+            entries.append((os.stat(entry_dir).st_mtime, name, size))
+
+        total = sum(size for _, _, size in entries)
+        for _, name, size in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if name != keep:
+                shutil.rmtree(os.path.join(directory, name), ignore_errors=True)
+                total -= size
@@ -0,0 +1,126 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+import record_reader
+from cache import ParseCache
+from filters import RecordFilter
+from pdb_reader import PDBReader
+
+EXAMPLE_PDB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "1.pdb")
+
+
+class TestParseCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.tmp, "cache")
+        self.pdb = shutil.copy(EXAMPLE_PDB, self.tmp)
+        self.cache = ParseCache(self.cache_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_records_round_trip(self):
+        with PDBReader(self.pdb) as pdb:
+            expected = list(pdb)
+
+        for _ in range(2):
+            with PDBReader(self.pdb, cache=self.cache) as pdb:
+                self.assertEqual(list(pdb), expected)
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+
+    def test_selected_readers_and_next(self):
+        readers = [record_reader.Readers["Cryst1"], record_reader.Readers["Ter"]]
+        with PDBReader(self.pdb, readers) as pdb:
+            expected = list(pdb)
+
+        with PDBReader(self.pdb, readers, cache=self.cache) as pdb:
+            self.assertEqual(next(pdb), expected[0])
+            self.assertEqual(list(pdb), expected[1:])
+            pdb.reset()
+            self.assertEqual(list(pdb), expected)
+
+    def test_to_arrays_memory_mapped(self):
+        with PDBReader(self.pdb) as pdb:
+            expected = pdb.to_arrays()
+
+        with PDBReader(self.pdb, cache=self.cache) as pdb:
+            pdb.to_arrays()
+            arrays = pdb.to_arrays()
+            hetatm = pdb.to_arrays(["Hetatm"], fields=["x"])
+
+        self.assertIsInstance(arrays["x"], np.memmap)
+        self.assertEqual(set(arrays), set(expected))
+        for name in expected:
+            self.assertEqual(arrays[name].tolist(), expected[name].tolist())
+        self.assertEqual(hetatm["x"].tolist(), [14.777])
+
+    def test_to_arrays_record_type_filter(self):
+        record_filter = RecordFilter(record_types=["Atom"])
+        with PDBReader(self.pdb, filters=record_filter) as pdb:
+            expected = pdb.to_arrays()
+
+        with PDBReader(self.pdb, filters=record_filter, cache=self.cache) as pdb:
+            self.assertIsNotNone(pdb.cache)
+            arrays = pdb.to_arrays()
+
+        self.assertEqual(len(arrays["x"]), 8)
+        self.assertEqual(set(arrays), set(expected))
+        for name in expected:
+            self.assertEqual(arrays[name].tolist(), expected[name].tolist())
+
+    def test_lazy_records_skip_cache(self):
+        with PDBReader(self.pdb, lazy=True, cache=self.cache) as pdb:
+            self.assertIsNone(pdb.cache)
+            records = list(pdb)
+        self.assertTrue(all(isinstance(r, record_reader.LazyRecord) for r in records))
+        self.assertFalse(os.path.exists(self.cache_dir) and os.listdir(self.cache_dir))
+
+    def test_read_only_directory(self):
+        with PDBReader(self.pdb) as pdb:
+            expected = list(pdb)
+
+        # Like a file in a read-only archive, whose .pdbcache can't be created.
+        error = PermissionError("Read-only file system")
+        with mock.patch.object(os, "makedirs", side_effect=error):
+            with PDBReader(self.pdb, cache=ParseCache()) as pdb:
+                self.assertEqual(list(pdb), expected)
+                self.assertEqual(len(pdb.to_arrays()["x"]), 9)
+        self.assertFalse(os.path.exists(os.path.join(self.tmp, ".pdbcache")))
+
+    def test_modified_file_is_reparsed(self):
+        with PDBReader(self.pdb, cache=self.cache) as pdb:
+            self.assertEqual(len(pdb.to_arrays()["x"]), 9)
+
+        with open(self.pdb, "a") as f:
+            f.write("ATOM    999  N   ALA     1      1.000   2.000   3.000  1.00  0.00\n")
+        os.utime(self.pdb, ns=(0, 0))
+
+        with PDBReader(self.pdb, cache=self.cache) as pdb:
+            self.assertEqual(len(pdb.to_arrays()["x"]), 10)
+
+    def test_lru_eviction(self):
+        other = shutil.copy(EXAMPLE_PDB, os.path.join(self.tmp, "2.pdb"))
+        cache = ParseCache(self.cache_dir, max_bytes=1)
+
+        first = cache.key(self.pdb)
+        cache.get(self.pdb)
+        cache.get(other)
+
+        self.assertEqual(os.listdir(self.cache_dir), [cache.key(other)])
+        self.assertNotEqual(first, cache.key(other))
+
+    def test_by_content_key(self):
+        other = shutil.copy(EXAMPLE_PDB, os.path.join(self.tmp, "2.pdb"))
+        cache = ParseCache(by_content=True)
+
+        self.assertEqual(cache.key(self.pdb), cache.key(other))
+        self.assertNotEqual(self.cache.key(self.pdb), self.cache.key(other))
+
+
+if __name__ == "__main__":
+    unittest.main()
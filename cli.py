@@ -0,0 +1,216 @@
+"""Exports the records of many PDB files to columnar tables.
+
+    python cli.py "archive/**/*.pdb.gz" structures/ --output out --format parquet \
+        --records Atom Hetatm --chains A B --residues 1-100
+
+Inputs are files, glob patterns or directories, which are searched recursively for
+PDB files. Each record type becomes a table in the output directory, e.g.
+out/atom.parquet, with a column per field plus a `file` column: the row of the file
+in out/files.csv, which also lists the files that failed to parse.
+
+Files are parsed in worker processes and their columns are appended to the tables
+as they arrive, so no more than --max-pending parsed files are held in memory.
+"""
+
+import argparse
+import concurrent.futures
+import csv
+import fnmatch
+import functools
+import glob
+import os
+import sys
+
+import numpy as np
+
+import batch
+import pdb_writer
+import record_reader
+import table_writer
+from filters import RecordFilter
+from pdb_reader import PDBReader
+
+# File names searched for in input directories.
+DEFAULT_PATTERNS = ("*.pdb", "*.ent") + tuple(
+    f"*{ext}{suffix}" for ext in (".pdb", ".ent") for suffix in pdb_writer.SUFFIXES
+)
+
+# Name of the table of the exported files, in the output directory.
+FILES_TABLE = "files.csv"
+
+
+def find_files(inputs, patterns=DEFAULT_PATTERNS):
+    """Yields the paths of inputs, expanding globs and directories.
+
+    Directories are walked recursively in sorted order for files matching any of
+    patterns. Other inputs without glob characters are yielded as they are, so
+    missing files are reported when they are read. Each path is yielded once.
+    """
+    seen = set()
+    for pattern in inputs:
+        found = [pattern]
+        if any(char in pattern for char in "*?["):
+            found = sorted(glob.glob(pattern, recursive=True))
+        for match in found:
+            paths = _walk(match, patterns) if os.path.isdir(match) else [match]
+            for path in paths:
+                key = os.path.normpath(path)
+                if key not in seen:
+                    seen.add(key)
+                    yield path
+
+
+def _walk(directory, patterns):
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(files):
+            if any(fnmatch.fnmatch(name, pattern) for pattern in patterns):
+                yield os.path.join(root, name)
+
+
+def _read_tables(path, record_types, fields, record_filter):
+    with PDBReader(path, filters=record_filter, use_mmap=True) as pdb:
+        return pdb.to_tables(record_types, fields)
+
+
+def export(
+    paths,
+    output,
+    format="csv",
+    record_types=("Atom", "Hetatm"),
+    fields=None,
+    record_filter=None,
+    workers=None,
+    max_pending=None,
+):
+    """Parses PDB files in worker processes and appends their records to tables.
+
+    Args:
+      paths: Iterable of PDB file paths. It is consumed lazily.
+      output: Directory of the tables. It is created if needed.
+      format: Key of `table_writer.FORMATS`.
+      record_types: Keys of `record_reader.Readers` to export, one table each.
+      fields: Names of the fields to export. Defaults to all fields.
+      record_filter: Optional `filters.RecordFilter` of the records to export.
+      workers: Number of worker processes. Defaults to the number of CPUs.
+      max_pending: Maximum number of files parsed but not yet written. Defaults to
+        two per worker.
+
+    Returns:
+      Dict of record type to the number of rows written, and the number of files
+      that failed.
+    """
+    workers = workers or os.cpu_count() or 1
+    max_pending = max_pending or 2 * workers
+    os.makedirs(output, exist_ok=True)
+
+    tables = {}
+    failed = 0
+    with open(os.path.join(output, FILES_TABLE), "w", newline="") as f:
+        files = csv.writer(f)
+        files.writerow(["file", "path", "error"])
+        try:
+            new_pool = functools.partial(concurrent.futures.ProcessPoolExecutor, workers)
+            args = (tuple(record_types), fields, record_filter)
+            tasks = batch.submit_bounded(
+                new_pool, _read_tables, paths, args, max_pending=max_pending
+            )
+            for i, (path, future) in enumerate(tasks):
+                try:
+                    arrays_by_name = future.result()
+                except Exception as e:  # Also BrokenProcessPool if the worker died.
+                    files.writerow([i, path, f"{type(e).__name__}: {e}"])
+                    failed += 1
+                    continue
+                _append(tables, output, format, i, arrays_by_name)
+                files.writerow([i, path, ""])
+        finally:
+            for table in tables.values():
+                table.close()
+
+    return {key: table.rows for key, table in tables.items()}, failed
+
+
+def _append(tables, output, format, file_index, arrays_by_name):
+    for name, arrays in arrays_by_name.items():
+        rows = len(arrays.pop("record"))
+        if not rows:
+            continue
+        table = tables.get(name)
+        if table is None:
+            suffix = table_writer.FORMATS[format].suffix
+            path = os.path.join(output, name.lower() + suffix)
+            table = tables[name] = table_writer.open_table(path, format)
+        table.write({"file": np.full(rows, file_index, np.int64), **arrays})
+
+
+def _residues(text):
+    """Parses a residue number or an inclusive range like "10-20"."""
+    start, sep, end = text.partition("-")
+    if not sep or not start:
+        return int(text)
+    return range(int(start), int(end) + 1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__.splitlines()[0],
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="\n".join(__doc__.splitlines()[1:]),
+    )
+    parser.add_argument("inputs", nargs="+", help="PDB files, globs or directories.")
+    parser.add_argument("-o", "--output", required=True, help="Directory of the tables.")
+    parser.add_argument(
+        "--format", choices=table_writer.available_formats(), default="csv"
+    )
+    parser.add_argument(
+        "--records",
+        nargs="+",
+        choices=list(record_reader.Readers),
+        default=["Atom", "Hetatm"],
+        help="Record types to export, one table each.",
+    )
+    parser.add_argument("--fields", nargs="+", help="Fields to export. Defaults to all.")
+    parser.add_argument("--chains", nargs="+")
+    parser.add_argument(
+        "--residues", nargs="+", type=_residues, help="Numbers or ranges, e.g. 7 10-20."
+    )
+    parser.add_argument("--altlocs", nargs="+")
+    parser.add_argument("--elements", nargs="+")
+    parser.add_argument("--models", nargs="+", type=int)
+    parser.add_argument(
+        "--pattern",
+        nargs="+",
+        default=DEFAULT_PATTERNS,
+        help="File names to find in directories.",
+    )
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--max-pending", type=int)
+    args = parser.parse_args(argv)
+
+    criteria = {
+        name: getattr(args, name)
+        for name in ("chains", "residues", "altlocs", "elements", "models")
+    }
+    record_filter = RecordFilter(**criteria) if any(criteria.values()) else None
+    rows, failed = export(
+        find_files(args.inputs, args.pattern),
+        args.output,
+        args.format,
+        args.records,
+        args.fields,
+        record_filter,
+        args.workers,
+        args.max_pending,
+    )
+
+    for name, count in rows.items():
+        print(f"{name}: {count} rows")
+    if failed:
+        print(f"{failed} files failed, see {os.path.join(args.output, FILES_TABLE)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+import contextlib
+import csv
+import gzip
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+import cli
+import table_writer
+from pdb_reader import PDBReader
+
+EXAMPLE_PDB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "1.pdb")
+
+_read_tables = cli._read_tables
+
+
+def _crash_on_marked_paths(path, *args):
+    """Reads path like cli._read_tables, but kills the worker for "crash" paths."""
+    if "crash" in os.path.basename(path):
+        os._exit(1)
+    return _read_tables(path, *args)
+
+
+class TestCli(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.inputs = os.path.join(self.tmp.name, "inputs")
+        self.output = os.path.join(self.tmp.name, "output")
+        os.makedirs(os.path.join(self.inputs, "b"))
+        self.plain = os.path.join(self.inputs, "a.pdb")
+        self.compressed = os.path.join(self.inputs, "b", "c.pdb.gz")
+        shutil.copy(EXAMPLE_PDB, self.plain)
+        with open(EXAMPLE_PDB, "rb") as f, gzip.open(self.compressed, "wb") as out:
+            out.write(f.read())
+        with open(os.path.join(self.inputs, "notes.txt"), "w") as f:
+            f.write("not a PDB file\n")
+
+        with PDBReader(EXAMPLE_PDB) as pdb:
+            self.atoms = pdb.to_arrays(("Atom",))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def files_table(self):
+        with open(os.path.join(self.output, cli.FILES_TABLE), newline="") as f:
+            return list(csv.DictReader(f))
+
+    def test_find_files(self):
+        pattern = os.path.join(self.inputs, "*.pdb")
+        paths = list(cli.find_files([self.inputs, pattern, "missing.pdb"]))
+        self.assertEqual(paths, [self.plain, self.compressed, "missing.pdb"])
+
+    def test_export(self):
+        missing = os.path.join(self.inputs, "missing.pdb")
+        paths = [self.plain, missing, self.compressed]
+        rows, failed = cli.export(paths, self.output, "npz", ["Atom", "Cryst1"], workers=1)
+
+        self.assertEqual(failed, 1)
+        self.assertEqual(rows, {"Atom": 2 * len(self.atoms["x"]), "Cryst1": 2})
+        files = self.files_table()
+        self.assertEqual([row["path"] for row in files], paths)
+        self.assertTrue(files[1]["error"].startswith("FileNotFoundError"))
+        with np.load(os.path.join(self.output, "atom.npz")) as atoms:
+            count = len(self.atoms["x"])
+            self.assertEqual(atoms["file"].tolist(), [0] * count + [2] * count)
+            np.testing.assert_array_equal(atoms["x"][count:], self.atoms["x"])
+            self.assertNotIn("record", atoms)
+
+    def test_worker_crash(self):
+        crash = os.path.join(self.inputs, "crash.pdb")
+        paths = [self.plain, crash, self.compressed]
+        with mock.patch.object(cli, "_read_tables", _crash_on_marked_paths):
+            rows, failed = cli.export(paths, self.output, "csv", ["Atom"], workers=2)
+
+        self.assertEqual(failed, 1)
+        self.assertEqual(rows, {"Atom": 2 * len(self.atoms["x"])})
+        files = self.files_table()
+        self.assertEqual([row["path"] for row in files], paths)
+        self.assertEqual([row["error"] for row in files[::2]], ["", ""])
+        self.assertTrue(files[1]["error"].startswith("BrokenProcessPool"))
+
+    @unittest.skipUnless(
+        "parquet" in table_writer.available_formats(), "requires pyarrow"
+    )
+    def test_main_parquet(self):
+        import pyarrow.parquet
+
+        argv = [self.plain, "-o", self.output, "--format", "parquet"]
+        argv += ["--records", "Atom", "--fields", "serial", "x", "--workers", "1"]
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(cli.main(argv), 0)
+
+        table = pyarrow.parquet.read_table(os.path.join(self.output, "atom.parquet"))
+        self.assertEqual(table.column_names, ["file", "serial", "x"])
+        self.assertEqual(table["serial"].to_pylist(), self.atoms["serial"].tolist())
+        self.assertEqual(table["x"].to_pylist(), self.atoms["x"].tolist())
+
+    def test_main(self):
+        argv = [self.inputs, "-o", self.output, "--residues", "10-20"]
+        argv += ["--fields", "serial", "x", "--workers", "1"]
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(cli.main(argv), 0)
+
+        with open(os.path.join(self.output, "atom.csv"), newline="") as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(list(rows[0]), ["file", "serial", "x"])
+        expected = [
+            serial
+            for serial, resseq in zip(self.atoms["serial"], self.atoms["resseq"])
+            if 10 <= resseq <= 20
+        ]
+        self.assertEqual([int(row["serial"]) for row in rows], 2 * expected)
+        self.assertEqual(len(self.files_table()), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,227 @@
+"""Columnar loading of PDB records into NumPy arrays.
+
+Instead of one namedtuple per record, every field becomes a NumPy array with one
+entry per record. Lines are converted in chunks, column by column, into arrays that
+grow as needed, so memory stays close to the size of the final arrays.
+"""
+
+import numpy as np
+
+import record_reader
+
+DEFAULT_CHUNK_SIZE = 65536
+
+
+def column_dtype(field):
+    """Returns the NumPy dtype used to store a FieldReader's values."""
+    if field.dtype is int:
+        return np.dtype(np.int64)
+    if field.dtype is float:
+        return np.dtype(np.float64)
+    return np.dtype(f"U{max(field.end - field.start, 1)}")
+
+
+def shared_fields(readers, names=None):
+    """Returns the FieldReaders that all readers have at the same columns.
+
+    Args:
+      readers: RecordReaders whose records are loaded together.
+      names: Names of the fields to select. Defaults to all fields of the first reader.
+
+    Raises:
+      ValueError: If a reader lacks a field or has it at different columns.
+    """
+    first, *others = readers
+    by_name = {field.name: field for field in first.fields}
+    if names is None:
+        names = list(by_name)
+
+    fields = []
+    for name in names:
+        field = by_name.get(name)
+        for reader in others:
+            if field is None or field not in reader.fields:
+                raise ValueError(
+                    f"Field {name!r} is not shared by the {first.name} and "
+                    f"{reader.name} specs."
+                )
+        if field is None:
+            raise ValueError(f"{first.name} has no field {name!r}.")
+        fields.append(field)
+    return fields
+
+
+def line_block(lines, width):
+    """Returns lines as an (N, width) array of bytes, cut or padded with spaces.
+
+    Whitespace control characters, such as the newlines of short lines, become
+    spaces. Returns None if a line has characters outside of latin-1, which would
+    not take up one byte each.
+    """
+    try:
+        data = "".join([line[:width].ljust(width) for line in lines]).encode("latin-1")
+    except UnicodeEncodeError:
+        return None
+    block = np.frombuffer(bytearray(data), np.uint8).reshape(len(lines), width)
+    block[(block >= ord("\t")) & (block <= ord("\r"))] = ord(" ")
+    return block
+
+
+def parse_numbers(block, dtype):
+    """Converts the fixed-width numbers in the rows of a byte block at once.
+
+    Blank rows are 0, as in `FieldReader.read`. The conversion is NumPy's cast of
+    byte strings, which parses floats to the same correctly rounded values as
+    `float`.
+
+    Args:
+      block: (N, width) uint8 array, e.g. a column range of `line_block`.
+      dtype: int or float.
+
+    Raises:
+      ValueError: If a row is not a number.
+    """
+    block = np.array(block)  # A contiguous copy, whose rows can be viewed as bytes.
+    block[(block == ord(" ")).all(1), -1] = ord("0")
+    strings = block.view(f"S{block.shape[1]}").ravel()
+    return strings.astype(np.int64 if dtype is int else np.float64)
+
+
+def convert_column(field, lines, block=None):
+    """Converts one field across a list of lines, like `FieldReader.read` does.
+
+    With a `line_block` of the lines, numbers are converted all at once by
+    `parse_numbers`. If that fails on a malformed value, the column is converted
+    line by line, which raises the error of the line.
+    """
+    start, end, dtype = field.start, field.end, field.dtype
+    if dtype is str:
+        return [line[start:end].strip() for line in lines]
+    if block is not None and start < end <= block.shape[1]:
+        try:
+            return parse_numbers(block[:, start:end], dtype)
+        except ValueError:
+            pass
+    return [dtype(f) if (f := line[start:end]).strip() else 0 for line in lines]
+
+
+class ColumnBuilder:
+    """Accumulates converted columns in arrays that grow by doubling.
+
+    Attributes:
+      fields: FieldReaders of the columns.
+      size: Number of records stored.
+      columns: Dict of column name to array. Only the first `size` rows are valid.
+    """
+
+    def __init__(self, fields, capacity=DEFAULT_CHUNK_SIZE):
+        self.fields = fields
+        # Numbers are converted from a byte block up to the end of the last one.
+        self.block_width = max((f.end for f in fields if f.dtype is not str), default=0)
+        self.size = 0
+        self.columns = {"record": np.empty(capacity, "U6")}
+        for field in fields:
+            self.columns[field.name] = np.empty(capacity, column_dtype(field))
+
+    def _reserve(self, count):
+        capacity = len(self.columns["record"])
+        if self.size + count <= capacity:
+            return
+        capacity = max(2 * capacity, self.size + count)
+        for name, column in self.columns.items():
+            grown = np.empty(capacity, column.dtype)
+            grown[: self.size] = column[: self.size]
+            self.columns[name] = grown
+
+    def add(self, record_names, lines):
+        """Converts and appends a chunk of lines with their record names."""
+        count = len(lines)
+        self._reserve(count)
+        end = self.size + count
+        self.columns["record"][self.size : end] = record_names
+        block = line_block(lines, self.block_width) if self.block_width else None
+        for field in self.fields:
+            column = convert_column(field, lines, block)
+            self.columns[field.name][self.size : end] = column
+        self.size = end
+
+    def arrays(self):
+        """Returns the columns trimmed to the number of records."""
+        return {name: column[: self.size].copy() for name, column in self.columns.items()}
+
+
+def read_arrays(lines, readers, fields=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Reads the lines matching readers into NumPy column arrays.
+
+    Args:
+      lines: Iterable of PDB lines, as str or bytes.
+      readers: RecordReaders of the records to load, e.g. Atom and Hetatm.
+      fields: Names of the fields to load. Defaults to all fields.
+      chunk_size: Number of lines converted at a time.
+
+    Returns:
+      Dict of field name to array, plus a "record" column with the record name
+      (e.g. "Atom") of each row. Integer fields are int64, real fields float64 and
+      strings fixed-width unicode, with blank numbers read as 0.
+    """
+    index = record_reader.RecordIndex(readers)
+    builder = ColumnBuilder(shared_fields(readers, fields), chunk_size)
+
+    names, chunk = [], []
+    for line in lines:
+        reader = index.reader_for(line)
+        if reader is None:
+            continue
+        names.append(reader.name)
+        chunk.append(line.decode() if isinstance(line, bytes) else line)
+        if len(chunk) == chunk_size:
+            builder.add(names, chunk)
+            names, chunk = [], []
+
+    if chunk:
+        builder.add(names, chunk)
+    return builder.arrays()
+
+
+def read_tables(lines, readers, fields=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Reads the lines of several record types into column arrays in one pass.
+
+    Unlike `read_arrays`, the record types don't need to share fields; each gets
+    its own table.
+
+    Args:
+      lines: Iterable of PDB lines, as str or bytes.
+      readers: RecordReaders of the records to load.
+      fields: Names of the fields to load. A record type gets those of its fields
+        that are listed. Defaults to all fields.
+      chunk_size: Number of lines of a record type converted at a time.
+
+    Returns:
+      Dict of record name (e.g. "Atom") to the columns of its records, as returned
+      by `read_arrays`.
+    """
+    index = record_reader.RecordIndex(readers)
+    builders, chunks = {}, {}
+    for reader in index.readers:
+        names = [f.name for f in reader.fields]
+        if fields is not None:
+            names = [name for name in fields if name in names]
+        builders[reader] = ColumnBuilder(shared_fields([reader], names), chunk_size)
+        chunks[reader] = []
+
+    for line in lines:
+        reader = index.reader_for(line)
+        if reader is None:
+            continue
+        chunk = chunks[reader]
+        chunk.append(line.decode() if isinstance(line, bytes) else line)
+        if len(chunk) == chunk_size:
+            builders[reader].add([reader.name] * len(chunk), chunk)
+            chunk.clear()
+
+    tables = {}
+    for reader, builder in builders.items():
+        if chunks[reader]:
+            builder.add([reader.name] * len(chunks[reader]), chunks[reader])
+        tables[reader.name] = builder.arrays()
+    return tables
@@ -0,0 +1,108 @@
+import os
+import unittest
+
+import numpy as np
+
+import columnar
+import record_reader
+from filters import RecordFilter
+from pdb_reader import PDBReader
+
+EXAMPLE_PDB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "1.pdb")
+
+
+class TestReadArrays(unittest.TestCase):
+    def setUp(self):
+        readers = [record_reader.Readers["Atom"], record_reader.Readers["Hetatm"]]
+        with PDBReader(EXAMPLE_PDB, readers) as pdb:
+            self.records = list(pdb)
+
+    def test_matches_records(self):
+        with PDBReader(EXAMPLE_PDB) as pdb:
+            arrays = pdb.to_arrays(chunk_size=3)
+
+        self.assertEqual(len(arrays["x"]), len(self.records))
+        self.assertEqual(list(arrays["record"]), [type(r).__name__ for r in self.records])
+        for name in ("serial", "name", "resseq", "x", "y", "z", "occupancy", "element"):
+            self.assertEqual(
+                arrays[name].tolist(), [getattr(r, name) for r in self.records], name
+            )
+
+    def test_dtypes(self):
+        with PDBReader(EXAMPLE_PDB) as pdb:
+            arrays = pdb.to_arrays(fields=["serial", "x", "element"])
+
+        self.assertEqual(set(arrays), {"record", "serial", "x", "element"})
+        self.assertEqual(arrays["serial"].dtype, np.int64)
+        self.assertEqual(arrays["x"].dtype, np.float64)
+        self.assertEqual(arrays["element"].dtype.kind, "U")
+
+    def test_unshared_field(self):
+        readers = [record_reader.Readers["Atom"], record_reader.Readers["Sigatm"]]
+        with self.assertRaises(ValueError):
+            columnar.shared_fields(readers, ["x"])
+
+    def test_no_records(self):
+        arrays = columnar.read_arrays(["END\n"], [record_reader.Readers["Atom"]])
+        self.assertEqual(len(arrays["x"]), 0)
+
+
+class TestReadTables(unittest.TestCase):
+    def test_matches_read_arrays(self):
+        with PDBReader(EXAMPLE_PDB) as pdb:
+            tables = pdb.to_tables(("Atom", "Hetatm", "Cryst1"), chunk_size=3)
+            atoms = pdb.to_arrays(("Atom",))
+
+        self.assertEqual(list(tables), ["Atom", "Hetatm", "Cryst1"])
+        for name, column in atoms.items():
+            self.assertEqual(tables["Atom"][name].tolist(), column.tolist(), name)
+        self.assertEqual(len(tables["Hetatm"]["x"]), 1)
+        self.assertEqual(tables["Cryst1"]["a"].tolist(), [52.0])
+
+    def test_fields_of_each_record_type(self):
+        with PDBReader(EXAMPLE_PDB) as pdb:
+            tables = pdb.to_tables(("Atom", "Cryst1"), fields=["serial", "a"])
+
+        self.assertEqual(list(tables["Atom"]), ["record", "serial"])
+        self.assertEqual(list(tables["Cryst1"]), ["record", "a"])
+
+    def test_filters(self):
+        record_filter = RecordFilter(record_types=["Atom"], elements=["H"])
+        with PDBReader(EXAMPLE_PDB, filters=record_filter) as pdb:
+            tables = pdb.to_tables(("Atom", "Hetatm"))
+
+        self.assertEqual(list(tables), ["Atom"])
+        self.assertEqual(set(tables["Atom"]["element"].tolist()), {"H"})
+
+
+class TestBatchConversion(unittest.TestCase):
+    def setUp(self):
+        self.x = next(f for f in record_reader.Readers["Atom"].fields if f.name == "x")
+        self.serial = record_reader.Readers["Atom"].fields[0]
+
+    def convert(self, field, lines):
+        block = columnar.line_block(lines, 80)
+        return columnar.convert_column(field, lines, block)
+
+    def test_same_as_field_reader(self):
+        values = ["  1.500", "-12.345", "       ", "  .5", " 5.", "  -0.0 ", " 1e3", ""]
+        lines = [f"ATOM   {i:>4}{'':20}{value}\n" for i, value in enumerate(values)]
+        expected = [self.x.read(line) for line in lines]
+        self.assertEqual(self.convert(self.x, lines).tolist(), expected)
+        self.assertEqual(self.convert(self.serial, lines).tolist(), list(range(8)))
+
+    def test_malformed_values(self):
+        lines = ["ATOM      1" + " " * 20 + "  1.5", "ATOM      2" + " " * 20 + "1.2.3"]
+        with self.assertRaises(ValueError):
+            self.convert(self.x, lines)
+        with self.assertRaises(ValueError):
+            self.x.read(lines[1])
+
+    def test_line_block(self):
+        block = columnar.line_block(["ab\n", "abcdef"], 4)
+        self.assertEqual(block.tobytes(), b"ab  abcd")
+        self.assertIsNone(columnar.line_block(["\u2603"], 4))
+
+
+if __name__ == "__main__":
+    unittest.main()
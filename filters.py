@@ -0,0 +1,135 @@
+"""Record filters evaluated on raw lines, before records are parsed.
+
+A RecordFilter selects records by type, chain, residue number, alternate location,
+element and model. PDBReader applies it while reading, so rejected lines are never
+parsed. Fields are read from their full PDB columns, e.g. the chain ID from column
+22 and the residue number from columns 23-26 (see `FieldReader.exact_columns`), and
+compared the way `FieldReader.read` converts them:
+
+    carbons = RecordFilter(record_types=["Atom"], elements=["C"], residues=[range(10, 21)])
+    with PDBReader("1.pdb", filters=carbons) as pdb:
+        ...
+"""
+
+import dataclasses
+
+import record_reader
+
+
+@dataclasses.dataclass
+class RecordFilter:
+    """Criteria a record has to meet. None means no constraint.
+
+    Field criteria only apply to records whose spec has the field; other records
+    pass them. Likewise, records outside of MODEL ... ENDMDL blocks pass `models`.
+
+    Attributes:
+      record_types: Keys of `record_reader.Readers` to keep.
+      chains: Chain IDs (`chainid` field) to keep.
+      residues: Residue numbers (`resseq` field) to keep, as ranges or integers.
+      altlocs: Alternate location indicators (`altloc` field) to keep.
+      elements: Element symbols (`element` field) to keep.
+      models: Serial numbers of the models to keep.
+    """
+
+    record_types: object = None
+    chains: object = None
+    residues: object = None
+    altlocs: object = None
+    elements: object = None
+    models: object = None
+
+    def select_readers(self, readers):
+        """Returns the readers whose records can pass the filter."""
+        if self.record_types is None:
+            return tuple(readers)
+        names = {record_reader.Readers[key].name for key in self.record_types}
+        return tuple(reader for reader in readers if reader.name in names)
+
+    @property
+    def filters_fields(self):
+        """Whether the filter looks at more than the record type."""
+        criteria = (self.chains, self.residues, self.altlocs, self.elements, self.models)
+        return any(criterion is not None for criterion in criteria)
+
+    def matcher(self, readers):
+        """Returns a LineMatcher for lines of the given readers, or None if unneeded."""
+        if not self.filters_fields:
+            return None
+        return LineMatcher(self, readers)
+
+
+def _allowed_strings(values):
+    # Holds both str and bytes, so raw lines of either type can be checked.
+    values = {str(value).strip() for value in values}
+    return frozenset(values | {value.encode() for value in values})
+
+
+def _allowed_integers(values):
+    ranges = [
+        value if isinstance(value, range) else range(value, value + 1) for value in values
+    ]
+    return lambda number: any(number in r for r in ranges)
+
+
+def _field_check(field, values):
+    field = field.exact_columns()
+    start, end = field.start, field.end
+    if field.dtype is str:
+        allowed = _allowed_strings(values)
+        return lambda line: line[start:end].strip() in allowed
+
+    allowed = _allowed_integers(values)
+    dtype = field.dtype
+    return lambda line: allowed(dtype(f) if (f := line[start:end]).strip() else 0)
+
+
+class LineMatcher:
+    """Checks raw lines against a RecordFilter.
+
+    It is called with every line and the reader found for it, None if there is none,
+    and keeps track of the current model.
+    """
+
+    def __init__(self, record_filter, readers):
+        criteria = {
+            "chainid": record_filter.chains,
+            "resseq": record_filter.residues,
+            "altloc": record_filter.altlocs,
+            "element": record_filter.elements,
+        }
+        self.checks = {}
+        for reader in readers:
+            self.checks[reader] = tuple(
+                _field_check(field, criteria[field.name])
+                for field in reader.fields
+                if criteria.get(field.name) is not None
+            )
+
+        self.models = None
+        if record_filter.models is not None:
+            self.models = set(record_filter.models)
+            self.model_reader = record_reader.Readers["Model"]
+            self.endmdl_reader = record_reader.Readers["Endmdl"]
+            self.model_serial = next(
+                f for f in self.model_reader.fields if f.name == "serial"
+            ).exact_columns()
+            self.model_index = record_reader.RecordIndex(
+                [self.model_reader, self.endmdl_reader]
+            )
+        self.model = None
+
+    def __call__(self, line, reader):
+        in_model = True
+        if self.models is not None:
+            marker = self.model_index.reader_for(line)
+            if marker is self.model_reader:
+                text = line.decode() if isinstance(line, bytes) else line
+                self.model = self.model_serial.read(text)
+            in_model = self.model is None or self.model in self.models
+            if marker is self.endmdl_reader:
+                self.model = None
+
+        if reader is None or not in_model:
+            return False
+        return all(check(line) for check in self.checks[reader])
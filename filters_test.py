@@ -0,0 +1,103 @@
+import io
+import os
+import unittest
+
+import record_reader
+from filters import RecordFilter
+from pdb_reader import PDBReader
+
+EXAMPLE_PDB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "1.pdb")
+
+
+class TestRecordFilter(unittest.TestCase):
+    def setUp(self):
+        with PDBReader(EXAMPLE_PDB) as pdb:
+            self.records = list(pdb)
+
+    def read(self, record_filter, **kwargs):
+        with PDBReader(EXAMPLE_PDB, filters=record_filter, **kwargs) as pdb:
+            return list(pdb)
+
+    def test_record_types(self):
+        records = self.read(RecordFilter(record_types=["Ter", "Cryst1"]))
+        self.assertEqual({type(r).__name__ for r in records}, {"Ter", "Cryst1"})
+        self.assertEqual(len(records), 3)
+
+    def test_residues_and_elements(self):
+        record_filter = RecordFilter(
+            record_types=["Atom", "Hetatm"], residues=[range(10, 20)], elements=["H"]
+        )
+        expected = [
+            r
+            for r in self.records
+            if isinstance(r, (record_reader.types["Atom"], record_reader.types["Hetatm"]))
+            and 10 <= r.resseq < 20
+            and r.element == "H"
+        ]
+
+        self.assertEqual(len(expected), 4)
+        self.assertEqual(self.read(record_filter), expected)
+        self.assertEqual(self.read(record_filter, use_mmap=True), expected)
+
+    def test_records_without_field_pass(self):
+        records = self.read(RecordFilter(residues=[1]))
+        expected = [r for r in self.records if getattr(r, "resseq", 1) == 1]
+
+        self.assertEqual(records, expected)
+        self.assertIn(self.records[1], records)  # CRYST1 has no resseq.
+
+    def test_models(self):
+        records = self.read(RecordFilter(models=[2]))
+        split = self.records.index(record_reader.types["Model"](2))
+        self.assertEqual(records, self.records[split:])
+
+        with PDBReader(EXAMPLE_PDB, filters=RecordFilter(models=[1])) as pdb:
+            first = next(pdb)
+            self.assertEqual([first] + list(pdb), self.records[:split])
+
+    def test_to_arrays(self):
+        with PDBReader(EXAMPLE_PDB, filters=RecordFilter(models=[2], elements=["C"])) as pdb:
+            arrays = pdb.to_arrays()
+        self.assertEqual(arrays["serial"].tolist(), [297])
+
+
+class TestRecordFilterColumns(unittest.TestCase):
+    """Filters read chain IDs, altlocs and residue numbers from their PDB columns."""
+
+    LINES = [
+        "MODEL     1000\n",
+        "ATOM      1  N   ALA A   1      11.104   6.134  -6.504  1.00  0.00           N\n",
+        "ATOM      2  CA AALA A1001      11.639   6.071  -5.147  1.00  0.00           C\n",
+        "ATOM      3  CA BALA B1001      11.639   6.071  -5.147  1.00  0.00           C\n",
+        "ENDMDL\n",
+        "MODEL     2000\n",
+        "ATOM      4  N   GLY B   1      10.883   6.779  -6.464  1.00  0.00           N\n",
+        "ENDMDL\n",
+    ]
+
+    def serials(self, **criteria):
+        text = "".join(self.LINES).encode()
+        record_filter = RecordFilter(record_types=["Atom"], **criteria)
+        with PDBReader(io.BytesIO(text), filters=record_filter) as pdb:
+            return [record.serial for record in pdb]
+
+    def test_chains(self):
+        self.assertEqual(self.serials(chains=["A"]), [1, 2])
+        self.assertEqual(self.serials(chains=["B"]), [3, 4])
+
+    def test_altlocs(self):
+        self.assertEqual(self.serials(altlocs=["A"]), [2])
+        self.assertEqual(self.serials(altlocs=[""]), [1, 4])
+
+    def test_four_digit_residues(self):
+        self.assertEqual(self.serials(residues=[1001]), [2, 3])
+        self.assertEqual(self.serials(residues=[1]), [1, 4])
+        self.assertEqual(self.serials(residues=[range(1000, 1002)], chains=["B"]), [3])
+
+    def test_four_digit_models(self):
+        self.assertEqual(self.serials(models=[2000]), [4])
+        self.assertEqual(self.serials(models=[0]), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
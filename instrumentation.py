@@ -0,0 +1,73 @@
+"""Opt-in parse statistics for PDBReader.
+
+Pass a ParseStats to a PDBReader to count lines, records and bytes and to time the
+stages of parsing. Readers without one run their usual loop, so there is no cost
+when statistics are off:
+
+    stats = ParseStats(callbacks=[lambda stats: metrics.send(stats.as_dict())])
+    with PDBReader("1.pdb", stats=stats) as pdb:
+        records = list(pdb)
+    print(stats.seconds["parse"], stats.records["Atom"])
+"""
+
+import collections
+import dataclasses
+
+# Stages of parsing a line, in order.
+STAGES = ("read", "dispatch", "filter", "parse")
+
+
+@dataclasses.dataclass
+class ParseStats:
+    """Counters and timings of the lines a PDBReader has read.
+
+    Statistics accumulate over all passes of all readers the object is given to.
+    Records served from a `cache.ParseCache` are not counted.
+
+    Attributes:
+      lines: Number of lines read.
+      bytes: Size of the lines read, in characters for plain text files and in bytes
+        for files read as bytes.
+      unmatched: Lines that matched no reader.
+      filtered: Lines of a reader that a filter rejected.
+      records: Counter of parsed records per record name.
+      seconds: Cumulative seconds per stage: reading lines, finding their reader,
+        checking filters, and parsing.
+      reader_seconds: Cumulative parse seconds per record name.
+      callbacks: Functions called with this object at the end of each pass, and
+        every `report_every` lines if that is set.
+      report_every: Line interval of intermediate callbacks, or None.
+    """
+
+    lines: int = 0
+    bytes: int = 0
+    unmatched: int = 0
+    filtered: int = 0
+    records: collections.Counter = dataclasses.field(default_factory=collections.Counter)
+    seconds: dict = dataclasses.field(default_factory=lambda: dict.fromkeys(STAGES, 0.0))
+    reader_seconds: collections.Counter = dataclasses.field(
+        default_factory=collections.Counter
+    )
+    callbacks: list = dataclasses.field(default_factory=list)
+    report_every: int = None
+
+    @property
+    def total_seconds(self):
+        return sum(self.seconds.values())
+
+    def report(self):
+        """Calls the callbacks with this object."""
+        for callback in self.callbacks:
+            callback(self)
+
+    def as_dict(self):
+        """Returns the statistics as plain, JSON serializable values."""
+        return {
+            "lines": self.lines,
+            "bytes": self.bytes,
+            "unmatched": self.unmatched,
+            "filtered": self.filtered,
+            "records": dict(self.records),
+            "seconds": dict(self.seconds),
+            "reader_seconds": dict(self.reader_seconds),
+        }
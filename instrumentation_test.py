@@ -0,0 +1,50 @@
+import os
+import unittest
+
+from filters import RecordFilter
+from instrumentation import ParseStats
+from pdb_reader import PDBReader
+
+EXAMPLE_PDB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "1.pdb")
+
+
+class TestParseStats(unittest.TestCase):
+    def setUp(self):
+        with open(EXAMPLE_PDB) as f:
+            self.lines = f.readlines()
+        with PDBReader(EXAMPLE_PDB) as pdb:
+            self.records = list(pdb)
+
+    def test_counts(self):
+        reports = []
+        stats = ParseStats(callbacks=[lambda s: reports.append(s.lines)])
+        with PDBReader(EXAMPLE_PDB, stats=stats) as pdb:
+            self.assertEqual(list(pdb), self.records)
+
+        self.assertEqual(stats.lines, len(self.lines))
+        self.assertEqual(stats.bytes, sum(len(line) for line in self.lines))
+        self.assertEqual(stats.unmatched, 0)
+        self.assertEqual(stats.records["Atom"], 8)
+        self.assertEqual(stats.records["Endmdl"], 2)  # Parsed, though not yielded.
+        self.assertEqual(sum(stats.records.values()), len(self.lines))
+        self.assertEqual(set(stats.reader_seconds), set(stats.records))
+        self.assertGreater(stats.seconds["parse"], 0)
+        self.assertEqual(reports, [len(self.lines)])
+
+    def test_unmatched_filtered_and_intermediate_reports(self):
+        reports = []
+        stats = ParseStats(callbacks=[lambda s: reports.append(s.lines)], report_every=10)
+        record_filter = RecordFilter(record_types=["Atom", "Sheet"], residues=[18])
+        with PDBReader(EXAMPLE_PDB, filters=record_filter, stats=stats, use_mmap=True) as pdb:
+            records = list(pdb)
+
+        self.assertEqual(stats.records, {"Atom": 4, "Sheet": 10})
+        self.assertEqual(len(records), 14)
+        self.assertEqual(stats.filtered, 4)
+        self.assertEqual(stats.unmatched, len(self.lines) - 18)
+        self.assertEqual(reports, [10, 20, 30, 30])
+        self.assertEqual(stats.as_dict()["records"], {"Atom": 4, "Sheet": 10})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+"""Byte offset index of the models, chains and TER records of a PDB file.
+
+The index is built in one pass over the raw lines and can be saved as a JSON sidecar
+next to the file, so records of a single model can be read by seeking to it instead
+of parsing everything before it.
+"""
+
+import dataclasses
+import json
+import os
+
+import record_reader
+
+# Bump when the layout of sidecar files changes.
+FORMAT_VERSION = 2
+
+
+@dataclasses.dataclass
+class ModelIndex:
+    """Byte offsets of the structure of a PDB file.
+
+    Model serials and chain IDs are read from their full PDB columns (see
+    `FieldReader.exact_columns`), so serials of four digits and chain IDs are
+    kept apart.
+
+    Attributes:
+      size: Size of the indexed file in bytes.
+      mtime_ns: Modification time of the indexed file.
+      models: Dict of model serial to the (start, end) byte range of the model,
+        from its MODEL line up to and including its ENDMDL line.
+      chains: List of (offset, model serial, chain ID) of the first ATOM/HETATM line
+        of each chain. A chain starts at the beginning of a model, after a TER
+        record, or where the chain ID changes. The model serial is None outside of
+        models.
+      ters: Byte offsets of the TER lines.
+    """
+
+    size: int
+    mtime_ns: int
+    models: dict = dataclasses.field(default_factory=dict)
+    chains: list = dataclasses.field(default_factory=list)
+    ters: list = dataclasses.field(default_factory=list)
+
+    @classmethod
+    def build(cls, path):
+        """Indexes path in a single pass."""
+        readers = record_reader.Readers
+        model, endmdl, ter = readers["Model"], readers["Endmdl"], readers["Ter"]
+        model_serial = next(f for f in model.fields if f.name == "serial").exact_columns()
+        chain_fields = {
+            reader: next(f for f in reader.fields if f.name == "chainid").exact_columns()
+            for reader in (readers["Atom"], readers["Hetatm"])
+        }
+        index = record_reader.RecordIndex([model, endmdl, ter, *chain_fields])
+
+        stat = os.stat(path)
+        result = cls(stat.st_size, stat.st_mtime_ns)
+        serial = start = chain = None
+        position = 0
+        with open(path, "rb") as f:
+            for line in f:
+                reader = index.reader_for(line)
+                if reader is model:
+                    if serial is not None:  # MODEL without ENDMDL.
+                        result.models[serial] = (start, position)
+                    serial = model_serial.read(line.decode())
+                    start, chain = position, None
+                elif reader is endmdl and serial is not None:
+                    result.models[serial] = (start, position + len(line))
+                    serial = chain = None
+                elif reader is ter:
+                    result.ters.append(position)
+                    chain = None
+                elif reader in chain_fields:
+                    chain_id = chain_fields[reader].read(line.decode())
+                    if chain != chain_id:
+                        result.chains.append((position, serial, chain_id))
+                        chain = chain_id
+                position += len(line)
+
+        if serial is not None:
+            result.models[serial] = (start, position)
+        return result
+
+    @staticmethod
+    def sidecar_path(path):
+        return f"{path}.models.json"
+
+    def matches(self, path):
+        """Whether the index is still up to date for path."""
+        stat = os.stat(path)
+        return (stat.st_size, stat.st_mtime_ns) == (self.size, self.mtime_ns)
+
+    def save(self, path):
+        """Writes the index to the sidecar file of path."""
+        data = dataclasses.asdict(self)
+        data["version"] = FORMAT_VERSION
+        data["models"] = [[serial, *span] for serial, span in self.models.items()]
+        with open(self.sidecar_path(path), "w") as f:
+            json.dump(data, f)
+
+    @classmethod
+    def load(cls, path):
+        """Reads the sidecar index of path, or returns None if it is missing or stale."""
+        try:
+            with open(cls.sidecar_path(path)) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.pop("version", None) != FORMAT_VERSION:
+            return None
+
+        data["models"] = {serial: (start, end) for serial, start, end in data["models"]}
+        data["chains"] = [tuple(chain) for chain in data["chains"]]
+        index = cls(**data)
+        return index if index.matches(path) else None
@@ -0,0 +1,98 @@
+import gzip
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+import record_reader
+from model_index import ModelIndex
+from pdb_reader import PDBReader
+
+EXAMPLE_PDB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "1.pdb")
+
+
+class TestModelIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.pdb = shutil.copy(EXAMPLE_PDB, self.tmp)
+        with open(self.pdb, "rb") as f:
+            self.data = f.read()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_build(self):
+        index = ModelIndex.build(self.pdb)
+
+        second = self.data.index(b"MODEL        2")
+        self.assertEqual(index.models, {1: (0, second), 2: (second, len(self.data))})
+        self.assertEqual(len(index.ters), 2)
+        self.assertTrue(all(self.data[t : t + 3] == b"TER" for t in index.ters))
+        chains = [(model, chain) for _, model, chain in index.chains]
+        self.assertEqual(chains, [(1, ""), (1, "P"), (2, "")])
+
+    def test_sidecar_round_trip(self):
+        index = ModelIndex.build(self.pdb)
+        index.save(self.pdb)
+
+        self.assertEqual(ModelIndex.load(self.pdb), index)
+
+        with open(self.pdb, "a") as f:
+            f.write("END\n")
+        self.assertIsNone(ModelIndex.load(self.pdb))
+
+    def test_model_records(self):
+        with PDBReader(self.pdb) as pdb:
+            records = list(pdb)
+            split = records.index(record_reader.types["Model"](2))
+
+            self.assertEqual(pdb.model(2), records[split:])
+            self.assertEqual(dict(pdb.models()), {1: records[:split], 2: records[split:]})
+            self.assertEqual([serial for serial, _ in pdb.models([2])], [2])
+            with self.assertRaises(KeyError):
+                pdb.model(3)
+        self.assertTrue(os.path.exists(ModelIndex.sidecar_path(self.pdb)))
+
+    def test_compressed_and_streams(self):
+        compressed = self.pdb + ".gz"
+        with gzip.open(compressed, "wb") as f:
+            f.write(self.data)
+
+        for source in (compressed, io.BytesIO(self.data)):
+            with PDBReader(source) as pdb:
+                with self.assertRaises(ValueError):
+                    pdb.model(1)
+                with self.assertRaises(ValueError):
+                    list(pdb.models())
+        self.assertFalse(os.path.exists(ModelIndex.sidecar_path(compressed)))
+
+    def test_model_without_sidecar(self):
+        with PDBReader(self.pdb, use_mmap=True) as pdb:
+            pdb.model_index(sidecar=False)
+            self.assertEqual(pdb.model(1)[0], record_reader.types["Model"](1))
+        self.assertFalse(os.path.exists(ModelIndex.sidecar_path(self.pdb)))
+
+    def test_four_digit_serials_and_chains(self):
+        with open(EXAMPLE_PDB) as f:
+            atom = next(line for line in f if line.startswith("ATOM"))
+        serials = [1, 999, 1000, 2000, 3000]
+        with open(self.pdb, "w") as f:
+            for serial in serials:
+                f.write(f"MODEL     {serial:4d}\n")
+                for chain in "AB":
+                    f.write(atom[:21] + chain + atom[22:])
+                f.write("ENDMDL\n")
+
+        index = ModelIndex.build(self.pdb)
+        self.assertEqual(list(index.models), serials)
+        expected = [(serial, chain) for serial in serials for chain in "AB"]
+        self.assertEqual([(model, chain) for _, model, chain in index.chains], expected)
+        with PDBReader(self.pdb) as pdb:
+            self.assertEqual(len(pdb.model(3000)), 3)
+            with self.assertRaises(KeyError):
+                pdb.model(0)
+
+
+if __name__ == "__main__":
+    unittest.main()
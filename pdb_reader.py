@@ -1,21 +1,150 @@
+import io
+import mmap
+import os
+import time
+
 import record_reader
+import streams
+from model_index import ModelIndex
 
 
 class PDBReader:
-    def __init__(self, filename, readers=tuple(record_reader.Readers.values())):
+    """Iterates over the parsed records of a PDB file.
+
+    Besides plain files, gzip, bz2 and xz compressed files and binary streams can be
+    read. They are read as bytes, decoding only the lines that are parsed. Records
+    can also be consumed from asyncio code with `async for`, which parses in a
+    background thread.
+
+    Attributes:
+      filename: Path of the PDB file, or a binary stream. Streams are not closed by
+        the reader, and `reset` rewinds them if they are seekable.
+      readers: RecordReaders to use. Lines that match none of them are skipped.
+      use_mmap: If True, the file is memory-mapped and read as bytes; only lines of
+        a requested record type are decoded and parsed. Pages of the mapping are
+        shared with other processes reading the same file. Ignored for compressed
+        files and streams.
+      compression: "gzip", "bz2", "xz", None, or "auto" to detect it from the magic
+        bytes of the input.
+      threaded: If True, lines are read, and decompressed, in a background thread
+        that stays a bounded number of lines ahead of the parser.
+      stats: Optional `instrumentation.ParseStats` that collects counts and timings
+        of the lines read.
+      lazy: If True, records are `record_reader.LazyRecord`s whose fields are parsed
+        on first access.
+      filters: Optional `filters.RecordFilter`, checked on the raw lines so that
+        rejected lines aren't parsed.
+      cache: Optional `cache.ParseCache`. Records are then loaded from the cache,
+        which parses and stores the file on a miss. Ignored when readers other than
+        those of `record_reader.Readers` are used, when filters look at more than
+        record types, for lazy records, which need the raw lines, or for streams.
+      follow_offset: Byte offset up to which `poll` has read the file. It can be
+        set to resume following a file from a known position.
+    """
+
+    def __init__(
+        self,
+        filename,
+        readers=tuple(record_reader.Readers.values()),
+        use_mmap=False,
+        lazy=False,
+        filters=None,
+        cache=None,
+        compression="auto",
+        threaded=False,
+        stats=None,
+    ):
         self.filename = filename
-        self.readers = readers
+        self.filters = filters
+        self.readers = filters.select_readers(readers) if filters else readers
+        self.index = record_reader.RecordIndex(self.readers)
+        self.use_mmap = use_mmap
+        self.compression = compression
+        self.threaded = threaded
+        self.stats = stats
+        self.lazy = lazy
+        standard = set(record_reader.Readers.values())
+        if (
+            not all(r in standard for r in self.readers)
+            or (filters and filters.filters_fields)
+            or lazy
+            or streams.is_stream(filename)
+        ):
+            cache = None
+        self.cache = cache
         self.f = None
+        self._started = False
+        self._background = None
+        self._matcher = None
+        self.buffer = None
+        self._cached = None
+        self._model_index = None
+        self.follow_offset = 0
+        self._followed_file = None
+        self._follow_matcher = None
         self.reset()
 
     def close(self):
-        if self.f and not self.f.closed:
+        self._stop_background()
+        if self.buffer is not None:
+            self.buffer.close()
+            self.buffer = None
+        if self.f and not self.f.closed and self.f is not self.filename:
             self.f.close()
 
     def reset(self):
+        self._cached = None
+        self._matcher = self._new_matcher(self.readers)
+        self._stop_background()
         if not self.f or self.f.closed:
+            self._open()
+        elif self._started:
+            # Only seek once something was read, so unseekable streams can be read.
+            if self.buffer is not None:
+                self.buffer.seek(0)
+            self.f.seek(0)
+        self._started = False
+
+    def _stop_background(self):
+        if self._background is not None:
+            self._background.close()
+            self._background = None
+
+    def _open(self):
+        compression = self.compression
+        if compression == "auto":
+            compression = streams.compression_of(self.filename)
+        if compression is not None or streams.is_stream(self.filename):
+            self.f = streams.open_binary(self.filename, compression)
+            return
+
+        if not self.use_mmap:
             self.f = open(self.filename)
-        self.f.seek(0)
+            return
+
+        self.f = open(self.filename, "rb")
+        # Empty files can't be mapped; they are read as plain binary files instead.
+        if os.fstat(self.f.fileno()).st_size:
+            self.buffer = mmap.mmap(self.f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _lines(self):
+        """Returns an iterator over the lines, as bytes unless read in text mode."""
+        self._started = True
+        if self.buffer is not None:
+            return iter(self.buffer.readline, b"")
+        if self.threaded:
+            if self._background is None:
+                self._background = streams.BackgroundLines(self.f)
+            return self._background
+        return self.f
+
+    def _binary(self):
+        """Returns a seekable binary view of the file."""
+        self._started = True
+        self._stop_background()
+        if self.buffer is not None:
+            return self.buffer
+        return self.f.buffer if isinstance(self.f, io.TextIOBase) else self.f
 
     def __enter__(self):
         self.reset()
@@ -25,19 +154,391 @@ class PDBReader:
         self.close()
         return False
 
+    def _new_matcher(self, readers):
+        if self.filters is None:
+            return None
+        return self.filters.matcher(readers)
+
+    def _parse(self, reader, record):
+        if isinstance(record, bytes):
+            record = record.decode()
+        if self.lazy:
+            return reader.read_lazy(record)
+        return reader.parse(record)
+
+    def _records(self, lines):
+        """Yields the records of lines that pass the readers and filters."""
+        if self.stats is not None:
+            return self._instrumented_records(lines)
+        return self._plain_records(lines)
+
+    def _plain_records(self, lines):
+        reader_for = self.index.reader_for
+        matcher = self._matcher
+        for line in lines:
+            reader = reader_for(line)
+            if matcher is not None:
+                if not matcher(line, reader):
+                    continue
+            elif reader is None:
+                continue
+
+            record = self._parse(reader, line)
+
+            if record:
+                yield record
+
+    def _instrumented_records(self, lines):
+        """Like `_plain_records`, recording counts and timings in self.stats."""
+        stats, seconds, clock = self.stats, self.stats.seconds, time.perf_counter
+        reader_for = self.index.reader_for
+        matcher = self._matcher
+        lines = iter(lines)
+        while True:
+            start = clock()
+            line = next(lines, None)
+            read = clock()
+            seconds["read"] += read - start
+            if line is None:
+                stats.report()
+                return
+
+            stats.lines += 1
+            stats.bytes += len(line)
+            if stats.report_every and stats.lines % stats.report_every == 0:
+                stats.report()
+
+            reader = reader_for(line)
+            dispatched = clock()
+            seconds["dispatch"] += dispatched - read
+            if matcher is not None:
+                accepted = matcher(line, reader)
+                seconds["filter"] += clock() - dispatched
+                if not accepted:
+                    if reader is None:
+                        stats.unmatched += 1
+                    else:
+                        stats.filtered += 1
+                    continue
+            elif reader is None:
+                stats.unmatched += 1
+                continue
+
+            start = clock()
+            record = self._parse(reader, line)
+            parse_seconds = clock() - start
+            seconds["parse"] += parse_seconds
+            stats.reader_seconds[reader.name] += parse_seconds
+            stats.records[reader.name] += 1
+
+            if record:
+                yield record
+
     def _read_matching_record(self, record):
-        for reader in self.readers:
-            if reader.matches(record):
-                return reader.read(record)
+        reader = self.index.reader_for(record)
+        if reader is None:
+            return None
+
+        return self._parse(reader, record)
+
+    def to_arrays(self, record_types=("Atom", "Hetatm"), fields=None, chunk_size=None):
+        """Reads coordinate records of the whole file into NumPy column arrays.
+
+        Requires NumPy. See `columnar.read_arrays` for the returned columns. With a
+        cache, the columns are taken from the cache entry.
+
+        Args:
+          record_types: Keys of `record_reader.Readers` to load. Their specs must have
+            the same columns for the selected fields.
+          fields: Names of the fields to load. Defaults to all fields.
+          chunk_size: Number of lines converted at a time.
+        """
+        import columnar
+
+        readers = [record_reader.Readers[key] for key in record_types]
+        if self.filters is not None:
+            readers = self.filters.select_readers(readers)
+        selected = [key for key in record_types if record_reader.Readers[key] in readers]
+        if self.cache is not None and selected and set(selected) <= {"Atom", "Hetatm"}:
+            entry = self.cache.get(self.filename, self.use_mmap)
+            return entry.select(selected, fields)
+
+        self.reset()
+        lines = self._lines()
+        matcher = self._new_matcher(readers)
+        if matcher is not None:
+            index = record_reader.RecordIndex(readers)
+            lines = (line for line in lines if matcher(line, index.reader_for(line)))
+        return columnar.read_arrays(
+            lines, readers, fields, chunk_size or columnar.DEFAULT_CHUNK_SIZE
+        )
+
+    def to_tables(self, record_types=("Atom", "Hetatm"), fields=None, chunk_size=None):
+        """Reads records of several types into NumPy column arrays in one pass.
+
+        Requires NumPy. See `columnar.read_tables` for the returned tables.
+
+        Args:
+          record_types: Keys of `record_reader.Readers` to load. Each gets a table.
+          fields: Names of the fields to load; a record type gets those it has.
+            Defaults to all fields.
+          chunk_size: Number of lines converted at a time.
+        """
+        import columnar
+
+        readers = [record_reader.Readers[key] for key in record_types]
+        if self.filters is not None:
+            readers = self.filters.select_readers(readers)
+        self.reset()
+        lines = self._lines()
+        matcher = self._new_matcher(readers)
+        if matcher is not None:
+            index = record_reader.RecordIndex(readers)
+            lines = (line for line in lines if matcher(line, index.reader_for(line)))
+        return columnar.read_tables(
+            lines, readers, fields, chunk_size or columnar.DEFAULT_CHUNK_SIZE
+        )
 
-        return None
+    def to_structure(self, fields=None, chunk_size=None):
+        """Reads the atoms of the whole file into a `structure.Structure`.
+
+        Requires NumPy. Filters select the atoms; MODEL and TER records are always
+        used, so models and chains are those of the file.
+
+        Args:
+          fields: Names of the atom fields to load. Defaults to all fields.
+          chunk_size: Number of lines converted at a time.
+        """
+        import columnar
+        import structure
+
+        self.reset()
+        lines = self._lines()
+        if self.filters is not None:
+            readers = record_reader.Readers
+            markers = {readers["Model"], readers["Endmdl"], readers["Ter"]}
+            atom_readers = self.filters.select_readers(
+                [readers[key] for key in structure.ATOM_RECORDS]
+            )
+            index = record_reader.RecordIndex([*markers, *atom_readers])
+            matcher = self._new_matcher(atom_readers)
+
+            def keep(line):
+                reader = index.reader_for(line)
+                if matcher is None:  # The filter only selects record types.
+                    return reader is not None
+                if reader in markers:
+                    matcher(line, None)  # Keeps track of the current model.
+                    return True
+                return matcher(line, reader)
+
+            lines = filter(keep, lines)
+        return structure.Structure.build(
+            lines, fields, chunk_size or columnar.DEFAULT_CHUNK_SIZE
+        )
+
+    def to_bond_graph(self, symmetric=True):
+        """Reads the CONECT records into a `bonds.BondGraph` of the file's atoms.
+
+        Requires NumPy. Filters are not applied, so atom indices are the positions
+        of all ATOM and HETATM records in the file.
+        """
+        import bonds
+
+        self.reset()
+        return bonds.BondGraph.build(self._lines(), symmetric)
+
+    def read_range(self, start, end=None):
+        """Yields the records of the lines that start in the byte range [start, end).
+
+        start must be the offset of a line start. This moves the read position, so
+        call `reset` before iterating over the whole file again.
+        """
+        source = self._binary()
+        source.seek(start)
+        self._matcher = self._new_matcher(self.readers)
+
+        def lines():
+            position = start
+            for line in iter(source.readline, b""):
+                if end is not None and position >= end:
+                    break
+                position += len(line)
+                yield line
+
+        return self._records(lines())
+
+    def model_index(self, sidecar=True):
+        """Returns the ModelIndex of the file, building it on first use.
+
+        Args:
+          sidecar: If True, the index is loaded from its sidecar file when that is up
+            to date, and otherwise built and saved to it.
+
+        Raises:
+          ValueError: If the file is a stream or compressed, since the index holds
+            offsets into the raw file.
+        """
+        if streams.is_stream(self.filename):
+            raise ValueError("Only files can be indexed, not streams.")
+        compression = self.compression
+        if compression == "auto":
+            compression = streams.compression_of(self.filename)
+        if compression is not None:
+            raise ValueError("Compressed files can't be indexed.")
+
+        if self._model_index is None or not self._model_index.matches(self.filename):
+            index = ModelIndex.load(self.filename) if sidecar else None
+            if index is None:
+                index = ModelIndex.build(self.filename)
+                if sidecar:
+                    try:
+                        index.save(self.filename)
+                    except OSError:
+                        pass  # The index still works, it is just not persisted.
+            self._model_index = index
+        return self._model_index
+
+    def model(self, serial):
+        """Returns the records of the model with the given serial number.
+
+        Only the lines of that model are read, found through `model_index`. This
+        moves the read position like `read_range`.
+
+        Raises:
+          KeyError: If the file has no such model.
+          ValueError: If the file is a stream or compressed.
+        """
+        start, end = self.model_index().models[serial]
+        return list(self.read_range(start, end))
+
+    def models(self, serials=None):
+        """Yields (serial, records) for the given model serials, or for all models."""
+        index = self.model_index()
+        for serial in index.models if serials is None else serials:
+            yield serial, self.model(serial)
+
+    def poll(self, complete_models=False):
+        """Returns the records of the complete lines appended since the last poll.
+
+        The first poll reads the file from `follow_offset`, by default its start.
+        Each later poll seeks to where the previous one stopped, so its cost is
+        proportional to the new data. A trailing line without a newline is still
+        being written and is left for the next poll. If the file was truncated or
+        replaced, it is read again from the start. This is independent of the
+        position of `reset` and iteration, and ignores the cache.
+
+        Args:
+          complete_models: If True, the lines of a MODEL are only parsed once its
+            ENDMDL is written, so a poll never returns part of a model.
+
+        Raises:
+          ValueError: If the file is a stream or compressed.
+        """
+        if streams.is_stream(self.filename):
+            raise ValueError("Only files can be followed, not streams.")
+
+        with open(self.filename, "rb") as f:
+            stat = os.fstat(f.fileno())
+            identity = (stat.st_dev, stat.st_ino)
+            replaced = self._followed_file not in (None, identity)
+            if replaced or stat.st_size < self.follow_offset:
+                self.follow_offset = 0
+            if self._followed_file is None or not self.follow_offset:
+                # Filters track the current model, so they start over with the file.
+                self._follow_matcher = self._new_matcher(self.readers)
+            self._followed_file = identity
+            if self.follow_offset == 0 and streams.detect_compression(f.read(6)):
+                raise ValueError("Compressed files can't be followed.")
+
+            f.seek(self.follow_offset)
+            matcher, self._matcher = self._matcher, self._follow_matcher
+            try:
+                return list(self._records(self._appended_lines(f, complete_models)))
+            finally:
+                self._matcher = matcher
+
+    def _appended_lines(self, f, complete_models):
+        """Yields the complete lines of f, advancing follow_offset past them."""
+        position = self.follow_offset
+        model = None
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            position += len(line)
+            if complete_models:
+                if line.startswith(b"MODEL"):
+                    model = []
+                if model is not None:
+                    model.append(line)
+                    if not line.startswith(b"ENDMDL"):
+                        continue
+                    lines, model = model, None
+                    yield from lines
+                    self.follow_offset = position
+                    continue
+            yield line
+            self.follow_offset = position
+
+    def follow(self, interval=1.0, complete_models=False, idle_timeout=None):
+        """Yields records as they are appended to the file, like `tail -f`.
+
+        Args:
+          interval: Seconds to wait between polls that found nothing new.
+          complete_models: Whether to only yield complete models, see `poll`.
+          idle_timeout: Seconds without new records after which to stop, or None
+            to follow the file until the generator is closed.
+        """
+        idle = 0.0
+        while True:
+            records = self.poll(complete_models)
+            yield from records
+            if records:
+                idle = 0.0
+                continue
+            if idle_timeout is not None and idle >= idle_timeout:
+                return
+            time.sleep(interval)
+            idle += interval
 
     def __next__(self):
         return next(iter(self))
 
-    def __iter__(self):
-        for line in self.f:
-            record = self._read_matching_record(line)
+    def __aiter__(self):
+        return streams.iterate_in_thread(self.__iter__)
+
+    def lines_and_records(self):
+        """Yields (line, record) of each record with the line it was parsed from.
 
+        Lines are str with their newline. The cache and stats aren't used, since
+        they don't keep lines. `assembly.assemble` uses the lines to read fields
+        from their full columns.
+        """
+        reader_for = self.index.reader_for
+        matcher = self._matcher
+        for line in self._lines():
+            reader = reader_for(line)
+            if matcher is not None:
+                if not matcher(line, reader):
+                    continue
+            elif reader is None:
+                continue
+
+            record = self._parse(reader, line)
             if record:
+                yield line.decode() if isinstance(line, bytes) else line, record
+
+    def __iter__(self):
+        if self.cache is not None:
+            if self._cached is None:
+                names = {reader.name for reader in self.readers}
+                entry = self.cache.get(self.filename, self.use_mmap)
+                self._cached = entry.records(names)
+            # Not `yield from`, which would close the shared iterator along with
+            # the generator made by each `__next__` call.
+            for record in self._cached:
                 yield record
+            return
+
+        for record in self._records(self._lines()):
+            yield record
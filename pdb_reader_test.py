@@ -0,0 +1,138 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import record_reader
+from pdb_reader import PDBReader
+
+RecordReader = record_reader.RecordReader
+EXAMPLE_PDB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "1.pdb")
+
+
+def linear_scan(readers, line):
+    for reader in readers:
+        if reader.matches(line):
+            return reader.read(line)
+    return None
+
+
+class TestPDBReaderDispatch(unittest.TestCase):
+    def test_same_records_as_linear_scan(self):
+        readers = tuple(record_reader.Readers.values())
+        with open(EXAMPLE_PDB) as f:
+            expected = [r for r in (linear_scan(readers, line) for line in f) if r]
+
+        with PDBReader(EXAMPLE_PDB) as pdb:
+            self.assertEqual(list(pdb), expected)
+
+    def test_selected_readers_only(self):
+        readers = [record_reader.Readers["Atom"], record_reader.Readers["Ter"]]
+        with PDBReader(EXAMPLE_PDB, readers) as pdb:
+            names = {type(record).__name__ for record in pdb}
+        self.assertEqual(names, {"Atom", "Ter"})
+
+    def test_lazy_records(self):
+        with PDBReader(EXAMPLE_PDB) as pdb:
+            expected = list(pdb)
+        with PDBReader(EXAMPLE_PDB, lazy=True, use_mmap=True) as pdb:
+            records = list(pdb)
+
+        self.assertTrue(all(isinstance(r, record_reader.LazyRecord) for r in records))
+        self.assertEqual(records, expected)
+
+    def test_lowercase_record_name(self):
+        with PDBReader(EXAMPLE_PDB) as pdb:
+            record = pdb._read_matching_record("ter     295      GLU    18\n")
+        self.assertIsInstance(record, record_reader.types["Ter"])
+
+    def test_longest_prefix_wins(self):
+        short = RecordReader.from_pdb_spec('1 - 6\tRecord name\t"TER"\n7 - 11\tInteger\ts')
+        long = RecordReader.from_pdb_spec('1 - 6\tRecord name\t"TERM"\n7 - 11\tInteger\ts')
+        with PDBReader(EXAMPLE_PDB, (short, long)) as pdb:
+            self.assertIs(pdb.index.reader_for("TERM    1\n"), long)
+            self.assertIs(pdb.index.reader_for("TER     1\n"), short)
+            self.assertIsNone(pdb.index.reader_for("ATOM    1\n"))
+
+
+class TestPDBReaderMmap(unittest.TestCase):
+    def test_same_records_as_text_mode(self):
+        with PDBReader(EXAMPLE_PDB) as pdb:
+            expected = list(pdb)
+        with PDBReader(EXAMPLE_PDB, use_mmap=True) as pdb:
+            self.assertIsNotNone(pdb.buffer)
+            self.assertEqual(list(pdb), expected)
+            self.assertEqual(list(pdb), [])
+            pdb.reset()
+            self.assertEqual(next(pdb), expected[0])
+        self.assertIsNone(pdb.buffer)
+
+    def test_to_arrays(self):
+        with PDBReader(EXAMPLE_PDB, use_mmap=True) as pdb:
+            arrays = pdb.to_arrays(fields=["x"])
+        with PDBReader(EXAMPLE_PDB) as pdb:
+            self.assertEqual(arrays["x"].tolist(), pdb.to_arrays(fields=["x"])["x"].tolist())
+
+    def test_empty_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "empty.pdb")
+            open(path, "w").close()
+            with PDBReader(path, use_mmap=True) as pdb:
+                self.assertEqual(list(pdb), [])
+
+
+class TestPDBReaderFollow(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "growing.pdb")
+        with open(EXAMPLE_PDB) as f:
+            self.lines = f.readlines()
+        with PDBReader(EXAMPLE_PDB) as pdb:
+            self.expected = list(pdb)
+        open(self.path, "w").close()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def append(self, text):
+        with open(self.path, "a") as f:
+            f.write(text)
+
+    def test_poll_appended_lines(self):
+        with PDBReader(self.path) as pdb:
+            self.assertEqual(pdb.poll(), [])
+            self.append("".join(self.lines[:3]) + self.lines[3][:20])
+            records = pdb.poll()
+            self.assertEqual(pdb.follow_offset, len("".join(self.lines[:3])))
+            self.append(self.lines[3][20:] + "".join(self.lines[4:]))
+            records += pdb.poll()
+            self.assertEqual(pdb.poll(), [])
+        self.assertEqual(records, self.expected)
+
+    def test_complete_models(self):
+        with PDBReader(self.path) as pdb:
+            self.append("".join(self.lines[:15]))
+            first = pdb.poll(complete_models=True)
+            self.assertEqual(pdb.follow_offset, len("".join(self.lines[:11])))
+            self.append("".join(self.lines[15:]))
+            second = pdb.poll(complete_models=True)
+        self.assertEqual(type(second[0]).__name__, "Model")
+        self.assertEqual(first + second, self.expected)
+
+    def test_truncated_file_is_read_again(self):
+        with PDBReader(self.path) as pdb:
+            self.append("".join(self.lines))
+            self.assertEqual(pdb.poll(), self.expected)
+            with open(self.path, "w") as f:
+                f.write(self.lines[0])
+            self.assertEqual(pdb.poll(), self.expected[:1])
+
+    def test_follow(self):
+        self.append("".join(self.lines))
+        with PDBReader(self.path) as pdb:
+            records = list(pdb.follow(interval=0.01, idle_timeout=0.02))
+        self.assertEqual(records, self.expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
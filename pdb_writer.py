@@ -0,0 +1,175 @@
+import io
+import itertools
+
+import record_reader
+import record_writer
+import streams
+
+# Compression implied by file name suffixes when compression is "auto".
+SUFFIXES = {".gz": "gzip", ".bz2": "bz2", ".xz": "xz"}
+
+# Options of the compressed file openers. gzip's default level 9 is several times
+# slower than level 6 for little gain on PDB text.
+OPENER_OPTIONS = {"gzip": {"compresslevel": 6}}
+
+
+class PDBWriter:
+    """Writes records to a PDB file.
+
+    Records are formatted with the RecordWriters of their type and reading the
+    written file with PDBReader gives the records back. Lines are collected and
+    written in batches.
+
+    Parsed records don't hold the first column of each field, since the reader
+    skips it, so their lines lose it: ALA is written as " LA" and chain IDs are
+    left blank. Lazy records keep their line and are written verbatim, so reading
+    with `lazy=True` keeps the source text of the records that aren't changed.
+
+        with PDBReader("1.pdb") as pdb, PDBWriter("ca.pdb.gz") as out:
+            out.write_records(r for r in pdb if getattr(r, "name", None) == "CA")
+
+    Attributes:
+      filename: Path of the PDB file, or a writable text or binary stream. Streams
+        are flushed but not closed by the writer.
+      writers: RecordWriters to use, by default those of all `record_reader.Readers`.
+      compression: "gzip", "bz2", "xz", None, or "auto" to choose it from the file
+        name suffix (.gz, .bz2, .xz). Ignored for streams.
+      batch_size: Number of lines collected before they are written.
+    """
+
+    def __init__(
+        self,
+        filename,
+        writers=tuple(record_writer.Writers.values()),
+        compression="auto",
+        batch_size=4096,
+    ):
+        self.filename = filename
+        self.writers = writers
+        self.compression = compression
+        self.batch_size = batch_size
+        # Writers by record class, filled in by writer_for so that only the record
+        # types written create their containers and formatters.
+        self._by_container = {}
+        self._by_name = {w.name: w for w in writers}
+        self._batch = []
+        self._open()
+
+    def _open(self):
+        if hasattr(self.filename, "write"):
+            self.f = self.filename
+            self._encode = not isinstance(self.f, io.TextIOBase)
+            return
+
+        compression = self.compression
+        if compression == "auto":
+            suffix = "." + str(self.filename).rsplit(".", 1)[-1]
+            compression = SUFFIXES.get(suffix)
+        if compression is None:
+            self.f = open(self.filename, "w")
+        else:
+            options = OPENER_OPTIONS.get(compression, {})
+            self.f = streams.OPENERS[compression](self.filename, "wt", **options)
+        self._encode = False
+
+    def writer_for(self, record):
+        """Returns the RecordWriter of record's type.
+
+        Raises:
+          ValueError: If no writer writes records of that type.
+        """
+        cls = type(record)
+        try:
+            return self._by_container[cls]
+        except KeyError:
+            pass
+        container = getattr(cls, "_container", cls)
+        for writer in reversed(self.writers):
+            if writer.name == container.__name__ and writer.reader.container is container:
+                self._by_container[cls] = writer
+                return writer
+        raise ValueError(f"No writer for {cls.__name__} records.")
+
+    def _add(self, lines):
+        self._batch.extend(lines)
+        if len(self._batch) >= self.batch_size:
+            self.flush()
+
+    def write(self, record):
+        """Writes one record."""
+        writer = self.writer_for(record)
+        self._add((_format(writer, record) + "\n",))
+
+    def write_records(self, records):
+        """Writes an iterable of records, such as the records of a PDBReader."""
+        writers = self._by_container
+        batch = self._batch
+        for record in records:
+            writer = writers.get(type(record))
+            if writer is None:
+                writer = self.writer_for(record)
+            batch.append(_format(writer, record) + "\n")
+            if len(batch) >= self.batch_size:
+                self.flush()
+
+    def write_lines(self, lines):
+        """Writes raw lines, e.g. REMARKs that have no reader, adding newlines."""
+        self._add(line.rstrip("\n") + "\n" for line in lines)
+
+    def write_arrays(self, arrays):
+        """Writes the records of columnar arrays, as returned by `PDBReader.to_arrays`.
+
+        Fields of a record type that are missing from arrays are left blank.
+        """
+        rows_by_name = {}
+        for row, name in enumerate(arrays["record"].tolist()):
+            rows_by_name.setdefault(name, []).append(row)
+
+        lines = [None] * len(arrays["record"])
+        for name, rows in rows_by_name.items():
+            try:
+                writer = self._by_name[name]
+            except KeyError:
+                raise ValueError(f"No writer for {name} records.") from None
+            columns = [
+                arrays[f.name][rows].tolist()
+                if f.name in arrays
+                else itertools.repeat("" if f.dtype is str else 0, len(rows))
+                for f in writer.fields
+            ]
+            values = zip(*columns) if columns else itertools.repeat((), len(rows))
+            format_record = writer.format
+            for row, record in zip(rows, values):
+                lines[row] = format_record(record) + "\n"
+
+        for start in range(0, len(lines), self.batch_size):
+            self._add(lines[start : start + self.batch_size])
+
+    def flush(self):
+        """Writes the collected lines to the file."""
+        if self._batch:
+            text = "".join(self._batch)
+            self.f.write(text.encode() if self._encode else text)
+            self._batch.clear()
+        self.f.flush()
+
+    def close(self):
+        if self.f is None:
+            return
+        self.flush()
+        if self.f is not self.filename:
+            self.f.close()
+        self.f = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.close()
+        return False
+
+
+def _format(writer, record):
+    if isinstance(record, record_reader.LazyRecord):
+        return record._line.rstrip("\r\n")
+    return writer.format(record)
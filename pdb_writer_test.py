@@ -0,0 +1,104 @@
+import gzip
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+import record_reader
+from pdb_reader import PDBReader
+from pdb_writer import PDBWriter
+
+EXAMPLE_PDB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "1.pdb")
+
+
+class TestPDBWriter(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        with PDBReader(EXAMPLE_PDB) as pdb:
+            self.records = list(pdb)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def round_trip(self, name, write, **reader_options):
+        path = os.path.join(self.tmp, name)
+        with PDBWriter(path, batch_size=5) as out:
+            write(out)
+        with PDBReader(path, **reader_options) as pdb:
+            return list(pdb)
+
+    def test_records(self):
+        records = self.round_trip("1.pdb", lambda out: out.write_records(self.records))
+        self.assertEqual(records, self.records)
+
+    def test_gzip(self):
+        records = self.round_trip(
+            "1.pdb.gz", lambda out: out.write_records(self.records), use_mmap=True
+        )
+        self.assertEqual(records, self.records)
+        with open(os.path.join(self.tmp, "1.pdb.gz"), "rb") as f:
+            self.assertEqual(f.read(2), b"\x1f\x8b")
+
+    def test_lazy_records_and_lines(self):
+        def write(out):
+            out.write_lines(["REMARK   1 WRITTEN BY A TEST"])
+            with PDBReader(EXAMPLE_PDB, lazy=True) as pdb:
+                for record in pdb:
+                    out.write(record)
+
+        self.assertEqual(self.round_trip("1.pdb", write), self.records)
+
+    def test_lazy_records_written_verbatim(self):
+        with open(EXAMPLE_PDB) as f:
+            source = f.readlines()
+
+        path = os.path.join(self.tmp, "1.pdb")
+        with PDBReader(EXAMPLE_PDB, lazy=True) as pdb, PDBWriter(path) as out:
+            out.write_records(pdb)
+        with open(path) as f:
+            written = f.readlines()
+        # The lines of the records, in order and unchanged.
+        self.assertEqual(len(written), len(self.records))
+        lines = iter(source)
+        self.assertTrue(all(line in lines for line in written))
+
+        # Parsed records skip the first column of each field.
+        atom = next(line for line in source if line.startswith("ATOM"))
+        with PDBReader(io.BytesIO(atom.encode())) as pdb:
+            records = list(pdb)
+        written = io.StringIO()
+        with PDBWriter(written) as out:
+            out.write_records(records)
+        self.assertEqual(written.getvalue()[17:20], " " + atom[18:20])
+
+    def test_arrays(self):
+        with PDBReader(EXAMPLE_PDB) as pdb:
+            arrays = pdb.to_arrays()
+        records = self.round_trip("1.pdb", lambda out: out.write_arrays(arrays))
+        expected = [r for r in self.records if type(r).__name__ in ("Atom", "Hetatm")]
+        self.assertEqual(records, expected)
+
+        coordinates = {key: arrays[key] for key in ("record", "x", "y", "z")}
+        records = self.round_trip("xyz.pdb", lambda out: out.write_arrays(coordinates))
+        self.assertEqual([(r.serial, r.x) for r in records], [(0, r.x) for r in expected])
+
+    def test_streams(self):
+        atoms = [r for r in self.records if isinstance(r, record_reader.types["Atom"])]
+        for stream in (io.StringIO(), io.BytesIO()):
+            with PDBWriter(stream) as out:
+                out.write_records(atoms)
+            self.assertFalse(stream.closed)
+            data = stream.getvalue()
+            data = data if isinstance(data, bytes) else data.encode()
+            with PDBReader(io.BytesIO(gzip.compress(data))) as pdb:
+                self.assertEqual(list(pdb), atoms)
+
+    def test_unknown_record_type(self):
+        with PDBWriter(os.path.join(self.tmp, "x.pdb")) as out:
+            with self.assertRaises(ValueError):
+                out.write(("not", "a", "record"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,8 @@
+import collections.abc
 import dataclasses
 import re
+import threading
+import zlib
 from collections import namedtuple
 
 import specs
@@ -11,13 +14,15 @@ class FieldReader:
 
     Used for reading PDB record segments. Holds information about start/end points and
     datatype. Provides a read method, that receives whole record (line) and returns
-    the field.
+    the field. For real fields, `decimals` is the number of decimals of the PDB format,
+    e.g. 3 for Real(8.3), which is used when writing the field.
     """
 
     name: str
     start: int
     end: int
     dtype: type
+    decimals: int = None
 
     def read(self, record):
         """Reads the field from record.
@@ -41,6 +46,17 @@ class FieldReader:
 
         return 0
 
+    def exact_columns(self):
+        """Returns a copy of the field that reads the columns the spec gives.
+
+        `read` slices `record[start:end]` with the spec's 1-based column numbers, so
+        it misses the first column of the field: single-column fields such as chain
+        IDs read as "", and numbers lose their leading digit. Parsed records keep
+        that behavior; code that needs the real PDB columns, e.g. to tell chains
+        apart, reads the field through this copy instead.
+        """
+        return dataclasses.replace(self, start=self.start - 1)
+
     @staticmethod
     def get_dtype(raw_dtype):
         dtype_map = ((int, "integer"), (float, "real"))
@@ -49,6 +65,11 @@ class FieldReader:
                 return python_type
         return str
 
+    @staticmethod
+    def get_decimals(raw_dtype):
+        match = re.search(r"real\(\d+\.(\d+)\)", raw_dtype.lower())
+        return int(match.group(1)) if match else None
+
     @classmethod
     def from_pdb_description(cls, specline):
         """An alternative constructor for FieldReader class.
@@ -70,8 +91,88 @@ class FieldReader:
         start = int(start)
         end = int(end[0] if end else start)
         dtype = cls.get_dtype(raw_dtype)
+        decimals = cls.get_decimals(specline.split("\t")[1])
+
+        return FieldReader(name, start, end, dtype, decimals)
+
+
+# Guards the creation of the attributes RecordReaders create on first use, so that
+# threads reading the same record type share one container class. Reentrant, since
+# creating parse or the lazy container creates container.
+_create_lock = threading.RLock()
+
+# Marks a field of a LazyRecord that hasn't been parsed yet.
+_UNPARSED = object()
+
+
+class LazyRecord:
+    """Mixin for records whose fields are parsed from the raw line on first access.
+
+    Lazy record classes subclass a RecordReader's container, so they pass the same
+    `isinstance` checks and can be used as the namedtuple would. The underlying
+    tuple holds only the raw line and a list of parsed values, filled in as fields
+    are read. Iterating, comparing or hashing a lazy record parses all its fields.
+    """
+
+    __slots__ = ()
+
+    @property
+    def _line(self):
+        return tuple.__getitem__(self, 0)
+
+    @classmethod
+    def _make(cls, iterable):
+        return cls._container._make(iterable)
+
+    def __len__(self):
+        return len(self._fields)
+
+    def __iter__(self):
+        return (getattr(self, name) for name in self._fields)
+
+    def __getitem__(self, index):
+        return tuple(self)[index]
+
+    def __eq__(self, other):
+        return tuple(self) == (tuple(other) if isinstance(other, LazyRecord) else other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __lt__(self, other):
+        return tuple(self) < tuple(other)
+
+    def __le__(self, other):
+        return tuple(self) <= tuple(other)
 
-        return FieldReader(name, start, end, dtype)
+    def __gt__(self, other):
+        return tuple(self) > tuple(other)
+
+    def __ge__(self, other):
+        return tuple(self) >= tuple(other)
+
+    def __hash__(self):
+        return hash(tuple(self))
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={value!r}" for name, value in zip(self._fields, self))
+        return f"{type(self).__name__}({fields})"
+
+    def __reduce__(self):
+        return self._container._make, (tuple(self),)
+
+
+def _lazy_field(i, field):
+    get = tuple.__getitem__
+
+    def read(self):
+        values = get(self, 1)
+        value = values[i]
+        if value is _UNPARSED:
+            value = values[i] = field.read(get(self, 0))
+        return value
+
+    return property(read, doc=f"Field {field.name}, parsed on first access.")
 
 
 class RecordReader:
@@ -95,19 +196,73 @@ class RecordReader:
     Attributes:
       fields: A tuple of FieldReaders.
       container: A named tuple with names corresponding to field.name for fields.
+      parse: Function that parses a record into the container. It is compiled from
+        the fields when possible, otherwise it is `read_fields`.
     """
 
-    def __init__(self, fields):
+    def __init__(self, fields, compile=True):
         """Creates a RecordReader from a sequence of FieldReaders.
 
         Args:
             fields: Instances of FieldReaders
+            compile: Whether to compile a specialized parse function for the fields.
         """
         self.name = fields[0].name.capitalize()
         self.fields = fields[1:]
-
-        # Create a container for fields.
-        self.container = namedtuple(self.name, [f.name for f in self.fields])
+        self._compile = compile
+        self._lazy_container = None
+        # container and parse are created by __getattr__ on first use, so that only
+        # the record types a program reads pay for their namedtuple and parser.
+
+    def __getattr__(self, attr):
+        if attr not in ("container", "parse"):
+            raise AttributeError(
+                f"{type(self).__name__!r} object has no attribute {attr!r}"
+            )
+        with _create_lock:
+            # Another thread may have created attr while this one waited. parse
+            # needs the container anyway.
+            if "container" not in vars(self):
+                self.container = namedtuple(self.name, [f.name for f in self.fields])
+            if attr == "parse" and "parse" not in vars(self):
+                parse = self.read_fields
+                if self._compile:
+                    try:
+                        parse = self.compile_parser()
+                    except SyntaxError:
+                        pass
+                self.parse = parse
+        return vars(self)[attr]
+
+    def compile_parser(self):
+        """Generates a function that parses a record in a single expression.
+
+        The generated code does one slice and one conversion per field and builds the
+        container positionally, with the same results as `FieldReader.read`. For the
+        spec in the class docstring it looks like:
+
+          def parse(record):
+              return container(
+                  record[7:8].strip(),
+                  dtype1(f) if (f := record[10:15]).strip() else 0,
+              )
+        """
+        namespace = {"container": self.container}
+        args = []
+        for i, field in enumerate(self.fields):
+            frag = f"record[{field.start}:{field.end}]"
+            if field.dtype is str:
+                args.append(f"{frag}.strip()")
+            else:
+                namespace[f"dtype{i}"] = field.dtype
+                args.append(f"dtype{i}(f) if (f := {frag}).strip() else 0")
+
+        source = "def parse(record):\n    return container(\n"
+        source += "".join(f"        {arg},\n" for arg in args)
+        source += "    )\n"
+
+        exec(compile(source, f"<{self.name} parser>", "exec"), namespace)
+        return namespace["parse"]
 
     @staticmethod
     def from_pdb_spec(spec):
@@ -116,7 +271,36 @@ class RecordReader:
         fields = [FieldReader.from_pdb_description(specline) for specline in speclines]
         return RecordReader(fields)
 
+    @staticmethod
+    def from_rows(rows):
+        """Creates a RecordReader from field rows, as in `spec_table.FIELDS`."""
+        return RecordReader(
+            [
+                FieldReader(name, start, end, DTYPES[dtype], decimals)
+                for name, start, end, dtype, decimals in rows
+            ]
+        )
+
     def read(self, record):
+        return self.parse(record)
+
+    def read_lazy(self, record):
+        """Returns a LazyRecord of the container type that parses fields on access."""
+        if self._lazy_container is None:
+            with _create_lock:
+                if self._lazy_container is None:
+                    namespace = {"__slots__": (), "_container": self.container}
+                    for i, field in enumerate(self.fields):
+                        namespace[field.name] = _lazy_field(i, field)
+                    self._lazy_container = type(
+                        self.name, (LazyRecord, self.container), namespace
+                    )
+
+        values = [_UNPARSED] * len(self.fields)
+        return tuple.__new__(self._lazy_container, (record, values))
+
+    def read_fields(self, record):
+        """Parses a record field by field with the FieldReaders."""
         parsed_fields = {field.name: field.read(record) for field in self.fields}
 
         return self.container(**parsed_fields)
@@ -125,8 +309,148 @@ class RecordReader:
         return record.lower().startswith(self.name.lower())
 
 
+class RecordIndex:
+    """Finds the RecordReader for a PDB line with a single dict lookup.
+
+    The key is the first `key_length` characters of a line (columns 1-6 for the
+    standard specs). Keys are seeded with the padded upper-case record names and other
+    spellings are resolved once and memoized, so each line costs a dict lookup instead
+    of a scan over all readers.
+
+    Prefix-collision policy: a reader matches when its name is a case-insensitive
+    prefix of the key, as in `RecordReader.matches`. Short names such as `Ter` or
+    `Model` can therefore be prefixes of longer ones; the longest matching name wins,
+    and among readers with the same name the first one given wins.
+
+    Lines may be `str` or ASCII `bytes`; bytes keys are memoized separately.
+    """
+
+    # Upper bound on memoized keys, so files full of junk lines can't grow the index
+    # without limit.
+    max_keys = 4096
+
+    def __init__(self, readers):
+        self.readers = tuple(readers)
+        self.key_length = max([6] + [len(reader.name) for reader in self.readers])
+        self._index = {}
+        for reader in self.readers:
+            key = reader.name.upper().ljust(self.key_length)
+            self._index.setdefault(key, self.find(key))
+
+    def find(self, key):
+        if isinstance(key, bytes):
+            key = key.decode("latin-1")
+        best = None
+        for reader in self.readers:
+            if reader.matches(key) and (best is None or len(reader.name) > len(best.name)):
+                best = reader
+        return best
+
+    def reader_for(self, line):
+        """Returns the reader for line, or None if no reader matches."""
+        key = line[: self.key_length]
+        try:
+            return self._index[key]
+        except KeyError:
+            reader = self.find(key)
+            if len(self._index) < self.max_keys:
+                self._index[key] = reader
+            return reader
+
+
+# Version of the row layout of spec_table.FIELDS. Tables of other versions are
+# ignored, as are tables generated from different specs.
+SPEC_TABLE_VERSION = 1
+
+# Field dtypes by their name in spec_table.
+DTYPES = {"str": str, "int": int, "float": float}
+
+
+def spec_checksum(all_specs):
+    """Returns a checksum of record specs, to tell whether a spec table is current."""
+    text = "\0".join(f"{key}\0{spec}" for key, spec in all_specs.items())
+    return zlib.crc32(text.encode())
+
+
+def parse_specs(all_specs):
+    """Returns the field rows of each spec: (name, start, end, dtype name, decimals)."""
+    table = {}
+    for key, spec in all_specs.items():
+        speclines = (line.strip() for line in spec.splitlines())
+        table[key] = tuple(
+            (f.name, f.start, f.end, f.dtype.__name__, f.decimals)
+            for f in map(FieldReader.from_pdb_description, filter(None, speclines))
+        )
+    return table
+
+
+def load_spec_table(all_specs):
+    """Returns the field rows of all_specs, from the generated spec_table if current.
+
+    Parsing the specs with regexes is most of the import time of this module, which
+    adds up in short-lived processes. The generated table is a plain literal that is
+    loaded from its .pyc; it is used only if its version and checksum match, so
+    edited specs are parsed until the table is regenerated with
+    `python record_reader.py`.
+    """
+    try:
+        import spec_table
+    except ImportError:
+        spec_table = None
+    if (
+        getattr(spec_table, "VERSION", None) == SPEC_TABLE_VERSION
+        and getattr(spec_table, "CHECKSUM", None) == spec_checksum(all_specs)
+    ):
+        return spec_table.FIELDS
+    return parse_specs(all_specs)
+
+
+def write_spec_table(path, all_specs):
+    """Writes the spec_table module of all_specs to path."""
+    lines = [
+        "# Generated from specs.ALL_SPECS by `python record_reader.py`. Do not edit.",
+        f"VERSION = {SPEC_TABLE_VERSION}",
+        f"CHECKSUM = {spec_checksum(all_specs)}",
+        "FIELDS = {",
+    ]
+    for key, rows in parse_specs(all_specs).items():
+        lines.append(f'    "{key}": (')
+        for name, start, end, dtype, decimals in rows:
+            lines.append(f'        ("{name}", {start}, {end}, "{dtype}", {decimals}),')
+        lines.append("    ),")
+    lines.append("}")
+    with open(path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+class _Containers(collections.abc.Mapping):
+    """The container of each reader of a dict of readers, created on first access."""
+
+    def __init__(self, readers):
+        self._readers = readers
+
+    def __getitem__(self, key):
+        return self._readers[key].container
+
+    def __iter__(self):
+        return iter(self._readers)
+
+    def __len__(self):
+        return len(self._readers)
+
+
 Readers = {
-    key: RecordReader.from_pdb_spec(spec) for key, spec in specs.ALL_SPECS.items()
+    key: RecordReader.from_rows(rows)
+    for key, rows in load_spec_table(specs.ALL_SPECS).items()
 }
 
-types = {key: reader.container for key, reader in Readers.items()}
+types = _Containers(Readers)
+
+
+if __name__ == "__main__":
+    import os
+
+    write_spec_table(
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "spec_table.py"),
+        specs.ALL_SPECS,
+    )
@@ -1,5 +1,14 @@
+import concurrent.futures
+import importlib.util
+import os
+import tempfile
+import time
 import unittest
+from unittest import mock
+
 import record_reader
+import spec_table
+import specs
 
 RecordReader = record_reader.RecordReader
 FieldReader = record_reader.FieldReader
@@ -43,6 +52,53 @@ class TestRecordRecord(unittest.TestCase):
         self.assertEqual(parsed.occupancy, 1.00)
         self.assertEqual(parsed.element, "H")
 
+    def test_compiled_parser_matches_field_readers(self):
+        self.assertIsNot(self.record_reader.parse, self.record_reader.read_fields)
+        compiled = self.record_reader.parse(self.record1)
+        self.assertEqual(compiled, self.record_reader.read_fields(self.record1))
+        self.assertIsInstance(compiled, self.record_reader.container)
+
+    def test_uncompiled_reader(self):
+        reader = RecordReader(
+            [FieldReader("atom", 1, 6, str)] + list(self.record_reader.fields),
+            compile=False,
+        )
+        self.assertEqual(reader.parse, reader.read_fields)
+        self.assertEqual(reader.read(self.record1).serial, 294)
+
+    def test_compiled_parser_blank_numbers(self):
+        parsed = self.record_reader.read("ATOM  ")
+        self.assertEqual((parsed.serial, parsed.x, parsed.name), (0, 0, ""))
+
+
+class TestLazyRecord(unittest.TestCase):
+    def setUp(self):
+        self.line = "ATOM    294 2HG  GLU    18     -13.518  -3.769   0.084  1.00  0.00           H"
+        self.reader = record_reader.Readers["Atom"]
+        self.lazy = self.reader.read_lazy(self.line)
+        self.eager = self.reader.parse(self.line)
+
+    def test_isinstance_of_container(self):
+        self.assertIsInstance(self.lazy, record_reader.types["Atom"])
+        self.assertIsInstance(self.lazy, record_reader.LazyRecord)
+
+    def test_fields_parsed_on_access(self):
+        self.assertIs(tuple.__getitem__(self.lazy, 1)[7], record_reader._UNPARSED)
+        self.assertEqual(self.lazy.x, -13.518)
+        self.assertEqual(tuple.__getitem__(self.lazy, 1)[7], -13.518)
+        self.assertIs(tuple.__getitem__(self.lazy, 1)[0], record_reader._UNPARSED)
+
+    def test_behaves_like_namedtuple(self):
+        self.assertEqual(self.lazy, self.eager)
+        self.assertEqual(self.eager, self.lazy)
+        self.assertEqual(hash(self.lazy), hash(self.eager))
+        self.assertEqual(repr(self.lazy), repr(self.eager))
+        self.assertEqual(len(self.lazy), len(self.eager))
+        self.assertEqual(self.lazy[1:3], self.eager[1:3])
+        self.assertEqual(self.lazy._asdict(), self.eager._asdict())
+        self.assertEqual(self.lazy._replace(x=1.0), self.eager._replace(x=1.0))
+        self.assertEqual(self.lazy._line, self.line)
+
 
 class TestFieldReader(unittest.TestCase):
     def setUp(self):
@@ -74,5 +130,67 @@ class TestFieldReader(unittest.TestCase):
         self.assertEqual(self.field_reader1.dtype, str)
 
 
+class TestSpecTable(unittest.TestCase):
+    def test_generated_table_is_current(self):
+        # Regenerate with `python record_reader.py` after editing specs.ALL_SPECS.
+        self.assertEqual(spec_table.VERSION, record_reader.SPEC_TABLE_VERSION)
+        self.assertEqual(spec_table.CHECKSUM, record_reader.spec_checksum(specs.ALL_SPECS))
+        self.assertEqual(spec_table.FIELDS, record_reader.parse_specs(specs.ALL_SPECS))
+
+    def test_readers_match_parsed_specs(self):
+        for key, spec in specs.ALL_SPECS.items():
+            parsed = RecordReader.from_pdb_spec(spec)
+            self.assertEqual(record_reader.Readers[key].name, parsed.name)
+            self.assertEqual(record_reader.Readers[key].fields, parsed.fields)
+
+    def test_edited_specs_are_parsed(self):
+        edited = dict(specs.ALL_SPECS, End="\n1 - 6\tRecord name\t\"END\"\n")
+        table = record_reader.load_spec_table(edited)
+        self.assertIsNot(table, spec_table.FIELDS)
+        self.assertEqual(table["End"], (("end", 1, 6, "str", None),))
+
+    def test_write_spec_table(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "spec_table.py")
+            record_reader.write_spec_table(path, specs.ALL_SPECS)
+            spec = importlib.util.spec_from_file_location("written_table", path)
+            written = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(written)
+        self.assertEqual(written.CHECKSUM, spec_table.CHECKSUM)
+        self.assertEqual(written.FIELDS, spec_table.FIELDS)
+
+    def test_container_and_parser_created_on_first_use(self):
+        reader = RecordReader.from_rows(spec_table.FIELDS["Ter"])
+        self.assertNotIn("container", vars(reader))
+        self.assertNotIn("parse", vars(reader))
+        record = reader.parse("TER     295      GLU    18")
+        self.assertIsInstance(record, reader.container)
+        self.assertIs(reader.container, type(record))
+
+    def test_created_once_by_concurrent_threads(self):
+        reader = RecordReader.from_rows(spec_table.FIELDS["Ter"])
+        created = []
+        namedtuple = record_reader.namedtuple
+
+        def slow_namedtuple(*args):
+            created.append(args)
+            time.sleep(0.05)  # Lets the other threads reach __getattr__.
+            return namedtuple(*args)
+
+        line = "TER     295      GLU    18"
+        with mock.patch.object(record_reader, "namedtuple", slow_namedtuple):
+            with concurrent.futures.ThreadPoolExecutor(8) as pool:
+                parsed = list(pool.map(lambda _: type(reader.parse(line)), range(8)))
+                lazy = list(pool.map(lambda _: type(reader.read_lazy(line)), range(8)))
+
+        self.assertEqual(len(created), 1)
+        self.assertEqual(set(parsed), {reader.container})
+        self.assertEqual(len(set(lazy)), 1)
+
+    def test_types(self):
+        self.assertIs(record_reader.types["Atom"], record_reader.Readers["Atom"].container)
+        self.assertEqual(list(record_reader.types), list(record_reader.Readers))
+
+
 if __name__ == "__main__":
     unittest.main()
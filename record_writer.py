@@ -0,0 +1,171 @@
+"""Formats parsed records back into fixed-width PDB lines.
+
+A RecordWriter is the inverse of a RecordReader: every field is written to the
+columns its FieldReader reads, so reading a written line gives the record back.
+Numbers are right-justified, with the decimals of the PDB format for reals, and
+strings left-justified. Zero integers are left blank, which reads as 0.
+"""
+
+import threading
+
+import record_reader
+
+# Width of the lines written, padded with spaces as in PDB files.
+LINE_WIDTH = 80
+
+# Guards the creation of RecordWriter.format, like record_reader._create_lock.
+_create_lock = threading.Lock()
+
+
+def format_float(value, width, decimals=None):
+    """Formats a real number for a field of width columns.
+
+    The value is written with the PDB format's decimals. Values with more decimals
+    are written in full when they fit, so that they read back unchanged, and are
+    rounded to fit otherwise.
+
+    Raises:
+      ValueError: If the integer part of value doesn't fit in width columns.
+    """
+    if decimals is not None:
+        text = f"{value:.{decimals}f}"
+        if float(text) == value and len(text) <= width:
+            return text
+    text = repr(float(value))
+    if len(text) <= width and "e" not in text:
+        return text
+    for digits in range(max(width - 2, 0), -1, -1):
+        text = f"{value:.{digits}f}"
+        if len(text) <= width:
+            return text
+    raise ValueError(f"{value!r} does not fit in {width} columns.")
+
+
+class RecordWriter:
+    """Formats records of a RecordReader's container into PDB lines.
+
+    Attributes:
+      reader: The RecordReader whose records are written.
+      name: Record name, e.g. "Atom".
+      fields: FieldReaders of the reader.
+      format: Function that returns the line of a record, without a newline. It is
+        compiled from the fields when possible, otherwise it is `format_fields`.
+    """
+
+    def __init__(self, reader, compile=True):
+        self.reader = reader
+        self.name = reader.name
+        self.fields = reader.fields
+        self.prefix = self.name.upper().ljust(6)
+        self.width = max([LINE_WIDTH, len(self.prefix)] + [f.end for f in self.fields])
+        self._compile = compile
+        # format is created by __getattr__ on first use, like RecordReader.parse.
+
+    def __getattr__(self, attr):
+        if attr != "format":
+            raise AttributeError(
+                f"{type(self).__name__!r} object has no attribute {attr!r}"
+            )
+        with _create_lock:
+            # Another thread may have created format while this one waited.
+            if "format" not in vars(self):
+                format = self.format_fields
+                if self._compile:
+                    try:
+                        format = self.compile_formatter()
+                    except SyntaxError:
+                        pass
+                self.format = format
+        return self.format
+
+    def compile_formatter(self):
+        """Generates a function that formats a record with a single %-template.
+
+        Values that don't fit their columns make the line longer, and reals with
+        more decimals than the PDB format don't read back unchanged; those records
+        are passed on to `format_fields`. For an ATOM record it looks like:
+
+          def format(record):
+              v0, v1, ..., v13, = record
+              line = template % (v0 or "", v1, ...)
+              if len(line) == 80 and float(line[31:38]) == v7 and ...:
+                  return line
+              return format_fields(record)
+
+        with a template of "ATOM  %4s %-3s%s%-2s%s%4s%s    %7.3f...".
+        """
+        names = [f"v{i}" for i in range(len(self.fields))]
+        template = [self.prefix]
+        args, checks = [], []
+        position = len(self.prefix)
+        for name, field in zip(names, self.fields):
+            template.append(" " * (field.start - position))
+            width = field.end - field.start
+            if field.dtype is str:
+                template.append(f"%-{width}s" if width else "%s")
+                args.append(name)
+            elif field.dtype is int:
+                template.append(f"%{width}s" if width else "%s")
+                args.append(f'{name} or ""')
+            elif field.decimals is not None:
+                template.append(f"%{width}.{field.decimals}f")
+                args.append(name)
+                checks.append(f"float(line[{field.start}:{field.end}]) == {name}")
+            else:
+                raise SyntaxError(f"No fixed format for field {field.name}.")
+            position = field.end
+        template.append(" " * (self.width - position))
+
+        checks.insert(0, f"len(line) == {self.width}")
+        body = [
+            f"line = template % ({''.join(arg + ', ' for arg in args)})",
+            f"if {' and '.join(checks)}:",
+            "    return line",
+            "return format_fields(record)",
+        ]
+        if names:
+            body.insert(0, f"{''.join(name + ', ' for name in names)}= record")
+        source = "def format(record):\n" + "".join(f"    {line}\n" for line in body)
+
+        namespace = {"template": "".join(template), "format_fields": self.format_fields}
+        exec(compile(source, f"<{self.name} formatter>", "exec"), namespace)
+        return namespace["format"]
+
+    def format_fields(self, record):
+        """Formats a record field by field.
+
+        Raises:
+          ValueError: If a value doesn't fit the columns of its field.
+        """
+        values = tuple(record)
+        if len(values) != len(self.fields):
+            raise ValueError(
+                f"{self.name} records have {len(self.fields)} fields, got {len(values)}."
+            )
+
+        line = [self.prefix]
+        position = len(self.prefix)
+        for field, value in zip(self.fields, values):
+            width = field.end - field.start
+            if field.dtype is str:
+                text = str(value).ljust(width)
+            elif field.dtype is int:
+                text = str(int(value)).rjust(width) if value else " " * width
+            else:
+                try:
+                    text = format_float(value, width, field.decimals).rjust(width)
+                except ValueError as e:
+                    raise ValueError(f"{self.name} field {field.name}: {e}") from None
+            if len(text) > width:
+                raise ValueError(
+                    f"{self.name} field {field.name} {value!r} does not fit in "
+                    f"{width} columns."
+                )
+            line.append(" " * (field.start - position))
+            line.append(text)
+            position = field.end
+        line.append(" " * (self.width - position))
+        return "".join(line)
+
+
+Writers = {key: RecordWriter(reader) for key, reader in record_reader.Readers.items()}
@@ -0,0 +1,83 @@
+import concurrent.futures
+import time
+import unittest
+from unittest import mock
+
+import record_reader
+import record_writer
+from record_writer import RecordWriter
+
+Readers = record_reader.Readers
+
+
+class TestRecordWriter(unittest.TestCase):
+    def setUp(self):
+        self.reader = Readers["Atom"]
+        self.writer = record_writer.Writers["Atom"]
+        self.line = (
+            "ATOM    294 2HG  GLU    18     -13.518  -3.769   0.084  1.00  0.00"
+            "           H"
+        )
+        self.record = self.reader.read(self.line)
+
+    def test_round_trip(self):
+        line = self.writer.format(self.record)
+        self.assertEqual(len(line), record_writer.LINE_WIDTH)
+        self.assertEqual(self.reader.read(line), self.record)
+        self.assertEqual(line[31:54], self.line[31:54])
+
+    def test_compiled_matches_fields(self):
+        records = [
+            self.record,
+            self.record._replace(x=1.23456),  # More decimals than Real(8.3).
+            self.record._replace(serial=0, occupancy=0),
+            self.reader.read("ATOM"),
+        ]
+        for record in records:
+            line = self.writer.format(record)
+            self.assertEqual(line, self.writer.format_fields(record))
+            self.assertEqual(self.reader.read(line), record)
+
+    def test_format_created_once_by_concurrent_threads(self):
+        writer = RecordWriter(self.reader)
+        created = []
+        compile_formatter = RecordWriter.compile_formatter
+
+        def slow_compile(writer):
+            created.append(writer)
+            time.sleep(0.05)  # Lets the other threads reach __getattr__.
+            return compile_formatter(writer)
+
+        with mock.patch.object(RecordWriter, "compile_formatter", slow_compile):
+            with concurrent.futures.ThreadPoolExecutor(8) as pool:
+                lines = list(pool.map(lambda _: writer.format(self.record), range(8)))
+
+        self.assertEqual(len(created), 1)
+        self.assertEqual(set(lines), {self.writer.format(self.record)})
+
+    def test_values_that_do_not_fit(self):
+        with self.assertRaises(ValueError):
+            self.writer.format(self.record._replace(name="TOOLONG"))
+        with self.assertRaises(ValueError):
+            self.writer.format(self.record._replace(serial=123456))
+        with self.assertRaises(ValueError):
+            self.writer.format(self.record._replace(x=1e9))
+
+        rounded = self.reader.read(self.writer.format(self.record._replace(x=-123.4567)))
+        self.assertEqual(rounded.x, -123.46)
+
+    def test_every_reader(self):
+        for key, reader in Readers.items():
+            writer = RecordWriter(reader)
+            self.assertIsNot(writer.format, writer.format_fields, key)
+            record = reader.read(reader.name.upper())
+            self.assertEqual(reader.read(writer.format(record)), record, key)
+
+    def test_format_float(self):
+        self.assertEqual(record_writer.format_float(1.5, 7, 3), "1.500")
+        self.assertEqual(record_writer.format_float(1.23456, 7, 3), "1.23456")
+        self.assertEqual(record_writer.format_float(1.234567891, 7, 3), "1.23457")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,234 @@
+"""Spatial neighbor queries over atom coordinates with a cell list.
+
+Atoms are binned into a uniform grid of cubic cells at least as large as the
+typical query cutoff, so finding the neighbors of an atom only looks at the atoms of
+the surrounding cells. Only occupied cells are stored, which keeps memory proportional
+to the number of atoms, however large the box. All queries are vectorized with NumPy.
+
+    with PDBReader("1.pdb") as pdb:
+        atoms = pdb.to_arrays()
+    cells = CellList.from_arrays(atoms, cell_size=4.0)
+    i, j, distances = cells.pairs_within(4.0)
+
+Periodic boundaries are supported for orthorhombic boxes, e.g. from a CRYST1 record
+via `box_from_cryst1`, using the minimum image convention.
+"""
+
+import itertools
+
+import numpy as np
+
+
+def box_from_cryst1(cryst1):
+    """Returns the (a, b, c) box lengths of a CRYST1 record.
+
+    Raises:
+      ValueError: If the unit cell is not orthorhombic.
+    """
+    if not (cryst1.alpha == cryst1.beta == cryst1.gamma == 90):
+        raise ValueError("Only orthorhombic unit cells can be used as periodic boxes.")
+    return np.array([cryst1.a, cryst1.b, cryst1.c], float)
+
+
+def coordinates(records):
+    """Returns an (N, 3) array of the x, y and z of records such as Atom records."""
+    return np.array([(r.x, r.y, r.z) for r in records], float).reshape(-1, 3)
+
+
+class CellList:
+    """A uniform grid of cells over a set of points.
+
+    Attributes:
+      points: (N, 3) array of the coordinates, wrapped into the box if periodic.
+      cell_size: Requested minimum edge length of the cells.
+      box: Box lengths of periodic boundaries, or None.
+    """
+
+    def __init__(self, points, cell_size, box=None):
+        points = np.asarray(points, float).reshape(-1, 3)
+        self.cell_size = float(cell_size)
+        self.box = None if box is None else np.asarray(box, float)
+
+        if self.box is None:
+            self.origin = points.min(axis=0) if len(points) else np.zeros(3)
+            cells = np.floor((points - self.origin) / self.cell_size).astype(np.int64)
+            self.shape = cells.max(axis=0) + 1 if len(points) else np.ones(3, np.int64)
+        else:
+            points = np.mod(points, self.box)
+            self.origin = np.zeros(3)
+            self.shape = np.maximum(np.floor(self.box / self.cell_size), 1)
+            self.shape = self.shape.astype(np.int64)
+            cells = np.floor(points / (self.box / self.shape)).astype(np.int64)
+            cells = np.minimum(cells, self.shape - 1)  # Points exactly on the box edge.
+        self.points = points
+
+        ids = self._cell_ids(cells)
+        self._order = np.argsort(ids, kind="stable")
+        self._cells = cells[self._order]
+        self._sorted_points = points[self._order]
+        self._ids, self._starts, self._counts = np.unique(
+            ids[self._order], return_index=True, return_counts=True
+        )
+
+    @classmethod
+    def from_arrays(cls, arrays, cell_size, box=None):
+        """Creates a CellList from the x, y and z columns of `PDBReader.to_arrays`."""
+        points = np.column_stack([arrays["x"], arrays["y"], arrays["z"]])
+        return cls(points, cell_size, box)
+
+    @classmethod
+    def from_records(cls, records, cell_size, box=None):
+        return cls(coordinates(records), cell_size, box)
+
+    def __len__(self):
+        return len(self.points)
+
+    def _cell_ids(self, cells):
+        if not len(cells):
+            return np.zeros(0, np.int64)
+        return np.ravel_multi_index(cells.T, self.shape)
+
+    def _offsets(self, reach):
+        """Returns the distinct cell offsets within reach cells in every dimension."""
+        per_axis = []
+        for n in self.shape:
+            offsets = np.arange(-reach, reach + 1)
+            if self.box is not None:
+                # In a periodic box, offsets that wrap to the same cell are one cell.
+                offsets = np.unique(np.mod(offsets, n))
+                offsets = np.where(offsets > n // 2, offsets - n, offsets)
+            per_axis.append(offsets)
+        return np.array(list(itertools.product(*per_axis)), np.int64).reshape(-1, 3)
+
+    def _members(self, cells):
+        """Returns start and count of the sorted points in each of cells."""
+        starts = np.zeros(len(cells), np.int64)
+        counts = np.zeros(len(cells), np.int64)
+        if self.box is None:
+            valid = np.all((cells >= 0) & (cells < self.shape), axis=1)
+        else:
+            valid = np.ones(len(cells), bool)
+            cells = np.mod(cells, self.shape)
+        if not len(self._ids) or not valid.any():
+            return starts, counts
+
+        ids = self._cell_ids(cells[valid])
+        positions = np.minimum(np.searchsorted(self._ids, ids), len(self._ids) - 1)
+        found = self._ids[positions] == ids
+        valid[valid] = found
+        starts[valid] = self._starts[positions[found]]
+        counts[valid] = self._counts[positions[found]]
+        return starts, counts
+
+    def _deltas(self, a, b):
+        delta = b - a
+        if self.box is not None:
+            delta -= self.box * np.round(delta / self.box)
+        return delta
+
+    def _cell_of(self, point):
+        if self.box is None:
+            return np.floor((point - self.origin) / self.cell_size).astype(np.int64)
+        point = np.mod(point, self.box)
+        cell = np.floor(point / (self.box / self.shape)).astype(np.int64)
+        return np.minimum(cell, self.shape - 1)
+
+    def _reach(self, distance):
+        """Returns the number of cells to look at in each direction for distance.
+
+        Offsets between cells of the grid are never larger than its shape, so the
+        reach is capped there.
+        """
+        edge = self.cell_size if self.box is None else np.min(self.box / self.shape)
+        return int(min(np.ceil(distance / edge), self.shape.max()))
+
+    def _candidates(self, point, radius):
+        """Returns sorted-order indices of the points in cells near point."""
+        if self.box is None:
+            # Cells outside the grid are empty, so the cells within reach of point,
+            # which may lie outside the grid, are clipped to it.
+            cell = np.floor((point - self.origin) / self.cell_size)
+            reach = np.ceil(radius / self.cell_size)
+            low = np.maximum(cell - reach, 0)
+            high = np.minimum(cell + reach, self.shape - 1)
+            axes = [np.arange(lo, hi + 1, dtype=np.int64) for lo, hi in zip(low, high)]
+            cells = np.array(list(itertools.product(*axes)), np.int64).reshape(-1, 3)
+        else:
+            cells = self._cell_of(point) + self._offsets(self._reach(radius))
+        starts, counts = self._members(cells)
+        return _ranges(starts, counts)
+
+    def query_radius(self, point, radius):
+        """Returns the indices of the points within radius of point, and distances.
+
+        Returns:
+          (indices, distances), sorted by distance. Indices refer to the points as
+          given to the constructor.
+        """
+        point = np.asarray(point, float)
+        candidates = self._candidates(point, radius)
+        deltas = self._deltas(point, self._sorted_points[candidates])
+        distances = np.linalg.norm(deltas, axis=1)
+        keep = distances <= radius
+        order = np.argsort(distances[keep], kind="stable")
+        return self._order[candidates[keep][order]], distances[keep][order]
+
+    def query_knn(self, point, k):
+        """Returns the indices and distances of the k points nearest to point.
+
+        The search radius starts at one cell and doubles until k points are inside it,
+        or until it reaches every point of the grid.
+        """
+        point = np.asarray(point, float)
+        k = min(k, len(self))
+        if self.box is None:
+            # The farthest corner of the grid from point.
+            far = self.origin + self.shape * self.cell_size
+            corner = np.maximum(abs(point - self.origin), abs(far - point))
+            limit = np.linalg.norm(corner)
+        else:
+            limit = np.linalg.norm(self.box / 2)
+        radius = min(self.cell_size, limit)
+        while True:
+            indices, distances = self.query_radius(point, radius)
+            if len(indices) >= k or radius >= limit:
+                return indices[:k], distances[:k]
+            radius = min(2 * radius, limit)
+
+    def pairs_within(self, cutoff):
+        """Returns all pairs of points closer than or as close as cutoff.
+
+        Returns:
+          (i, j, distances) arrays with i < j, indexing the points as given to the
+          constructor, sorted by i and then j.
+        """
+        reach = self._reach(cutoff)
+        n = len(self)
+        all_i, all_j, all_d = [], [], []
+        for offset in self._offsets(reach):
+            starts, counts = self._members(self._cells + offset)
+            i = np.repeat(np.arange(n), counts)
+            j = _ranges(starts, counts)
+            keep = self._order[i] < self._order[j]
+            i, j = i[keep], j[keep]
+            distances = np.linalg.norm(
+                self._deltas(self._sorted_points[i], self._sorted_points[j]), axis=1
+            )
+            close = distances <= cutoff
+            all_i.append(self._order[i[close]])
+            all_j.append(self._order[j[close]])
+            all_d.append(distances[close])
+
+        i, j, distances = (np.concatenate(a) for a in (all_i, all_j, all_d))
+        order = np.lexsort((j, i))
+        return i[order], j[order], distances[order]
+
+
+def _ranges(starts, counts):
+    """Concatenates arange(start, start + count) for each start and count."""
+    total = int(counts.sum())
+    if not total:
+        return np.zeros(0, np.int64)
+    ends = np.cumsum(counts)
+    offsets = np.arange(total) - np.repeat(ends - counts, counts)
+    return np.repeat(starts, counts) + offsets
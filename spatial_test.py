@@ -0,0 +1,92 @@
+import os
+import unittest
+
+import numpy as np
+
+import spatial
+from pdb_reader import PDBReader
+from record_reader import Readers
+
+EXAMPLE_PDB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "1.pdb")
+
+
+def brute_force_distances(points, box=None):
+    deltas = points[None, :] - points[:, None]
+    if box is not None:
+        deltas -= box * np.round(deltas / box)
+    return np.linalg.norm(deltas, axis=2)
+
+
+class TestCellList(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.box = np.array([20.0, 25.0, 30.0])
+        self.points = rng.uniform(0, 1, (500, 3)) * self.box
+
+    def test_pairs_within(self):
+        for box in (None, self.box):
+            distances = brute_force_distances(self.points, box)
+            expected_i, expected_j = np.nonzero(np.triu(distances <= 3.5, 1))
+
+            cells = spatial.CellList(self.points, cell_size=3.0, box=box)
+            i, j, d = cells.pairs_within(3.5)
+            np.testing.assert_array_equal(i, expected_i)
+            np.testing.assert_array_equal(j, expected_j)
+            np.testing.assert_allclose(d, distances[i, j])
+
+    def test_query_radius_and_knn(self):
+        for box in (None, self.box):
+            distances = brute_force_distances(self.points, box)[7]
+            cells = spatial.CellList(self.points, cell_size=4.0, box=box)
+
+            indices, d = cells.query_radius(self.points[7], 6.0)
+            self.assertEqual(set(indices), set(np.nonzero(distances <= 6.0)[0]))
+            self.assertTrue(np.all(np.diff(d) >= 0))
+
+            indices, d = cells.query_knn(self.points[7], 12)
+            np.testing.assert_array_equal(indices, np.argsort(distances)[:12])
+            np.testing.assert_allclose(d, np.sort(distances)[:12])
+
+    def test_queries_outside_the_points(self):
+        points = np.random.default_rng(1).uniform(0, 10, (50, 3))
+        cells = spatial.CellList(points, cell_size=4.0)
+        for query in ([-14.0, 5.0, 5.0], [5.0, 25.0, -3.0], [1e6, -1e6, 1e6]):
+            distances = np.linalg.norm(points - query, axis=1)
+
+            indices, d = cells.query_radius(query, 20.0)
+            self.assertEqual(set(indices), set(np.nonzero(distances <= 20.0)[0]))
+
+            indices, d = cells.query_knn(query, 5)
+            np.testing.assert_array_equal(indices, np.argsort(distances)[:5])
+            indices, d = cells.query_knn(query, 100)
+            self.assertEqual(len(indices), 50)
+            np.testing.assert_allclose(d, np.sort(distances))
+
+        indices, _ = cells.query_radius([-14.0, 5.0, 5.0], np.inf)
+        self.assertEqual(len(indices), 50)
+
+    def test_empty(self):
+        cells = spatial.CellList(np.zeros((0, 3)), cell_size=4.0)
+        self.assertEqual(len(cells.pairs_within(4.0)[0]), 0)
+        self.assertEqual(len(cells.query_knn([0, 0, 0], 3)[0]), 0)
+
+    def test_from_pdb(self):
+        readers = (Readers["Cryst1"], Readers["Atom"])
+        with PDBReader(EXAMPLE_PDB, readers=readers) as pdb:
+            records = list(pdb)
+        box = spatial.box_from_cryst1(records[0])
+        np.testing.assert_allclose(box, [52.0, 58.6, 61.9])
+
+        with PDBReader(EXAMPLE_PDB) as pdb:
+            arrays = pdb.to_arrays(record_types=("Atom",))
+        from_arrays = spatial.CellList.from_arrays(arrays, 4.0, box)
+        from_records = spatial.CellList.from_records(records[1:], 4.0, box)
+        for a, b in zip(from_arrays.pairs_within(4.0), from_records.pairs_within(4.0)):
+            np.testing.assert_array_equal(a, b)
+
+        with self.assertRaises(ValueError):
+            spatial.box_from_cryst1(records[0]._replace(gamma=120.0))
+
+
+if __name__ == "__main__":
+    unittest.main()
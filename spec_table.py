@@ -0,0 +1,274 @@
+# Generated from specs.ALL_SPECS by `python record_reader.py`. Do not edit.
+VERSION = 1
+CHECKSUM = 2071638303
+FIELDS = {
+    "Header": (
+        ("header", 1, 6, "str", None),
+        ("classification", 11, 50, "str", None),
+        ("depdate", 51, 59, "str", None),
+        ("idcode", 63, 66, "str", None),
+    ),
+    "Obslte": (
+        ("obslte", 1, 6, "str", None),
+        ("continuation", 9, 10, "str", None),
+        ("repdate", 12, 20, "str", None),
+        ("idcode", 22, 25, "str", None),
+        ("ridcode", 32, 35, "str", None),
+        ("ridcode1", 37, 40, "str", None),
+        ("ridcode2", 42, 45, "str", None),
+        ("ridcode3", 47, 50, "str", None),
+        ("ridcode4", 52, 55, "str", None),
+        ("ridcode5", 57, 60, "str", None),
+        ("ridcode6", 62, 65, "str", None),
+        ("ridcode7", 67, 70, "str", None),
+    ),
+    "Title": (
+        ("title", 1, 6, "str", None),
+        ("continuation", 9, 10, "str", None),
+        ("title", 11, 70, "str", None),
+    ),
+    "Caveat": (
+        ("caveat", 1, 6, "str", None),
+        ("continuation", 9, 10, "str", None),
+        ("idcode", 12, 15, "str", None),
+        ("comment", 20, 70, "str", None),
+    ),
+    "Compnd": (
+        ("compnd", 1, 6, "str", None),
+        ("continuation", 9, 10, "str", None),
+        ("compound", 11, 70, "str", None),
+    ),
+    "Source": (
+        ("source", 1, 6, "str", None),
+        ("continuation", 9, 10, "str", None),
+        ("srcname", 11, 70, "str", None),
+    ),
+    "Atom": (
+        ("atom", 1, 6, "str", None),
+        ("serial", 7, 11, "int", None),
+        ("name", 13, 16, "str", None),
+        ("altloc", 17, 17, "str", None),
+        ("resname", 18, 20, "str", None),
+        ("chainid", 22, 22, "str", None),
+        ("resseq", 23, 26, "int", None),
+        ("icode", 27, 27, "str", None),
+        ("x", 31, 38, "float", 3),
+        ("y", 39, 46, "float", 3),
+        ("z", 47, 54, "float", 3),
+        ("occupancy", 55, 60, "float", 2),
+        ("tempfactor", 61, 66, "float", 2),
+        ("element", 77, 78, "str", None),
+        ("charge", 79, 80, "str", None),
+    ),
+    "Hetatm": (
+        ("hetatm", 1, 6, "str", None),
+        ("serial", 7, 11, "int", None),
+        ("name", 13, 16, "str", None),
+        ("altloc", 17, 17, "str", None),
+        ("resname", 18, 20, "str", None),
+        ("chainid", 22, 22, "str", None),
+        ("resseq", 23, 26, "int", None),
+        ("icode", 27, 27, "str", None),
+        ("x", 31, 38, "float", 3),
+        ("y", 39, 46, "float", 3),
+        ("z", 47, 54, "float", 3),
+        ("occupancy", 55, 60, "float", 2),
+        ("tempfactor", 61, 66, "float", 2),
+        ("element", 77, 78, "str", None),
+        ("charge", 79, 80, "str", None),
+    ),
+    "Anisou": (
+        ("anisou", 1, 6, "str", None),
+        ("serial", 7, 11, "int", None),
+        ("name", 13, 16, "str", None),
+        ("altloc", 17, 17, "str", None),
+        ("resname", 18, 20, "str", None),
+        ("chainid", 22, 22, "str", None),
+        ("resseq", 23, 26, "int", None),
+        ("icode", 27, 27, "str", None),
+        ("u00", 29, 35, "int", None),
+        ("u11", 36, 42, "int", None),
+        ("u22", 43, 49, "int", None),
+        ("u01", 50, 56, "int", None),
+        ("u02", 57, 63, "int", None),
+        ("u12", 64, 70, "int", None),
+        ("element", 77, 78, "str", None),
+        ("charge", 79, 80, "str", None),
+    ),
+    "Ter": (
+        ("ter", 1, 6, "str", None),
+        ("serial", 7, 11, "int", None),
+        ("resname", 18, 20, "str", None),
+        ("chainid", 22, 22, "str", None),
+        ("resseq", 23, 26, "int", None),
+        ("icode", 27, 27, "str", None),
+    ),
+    "Model": (
+        ("model", 1, 6, "str", None),
+        ("serial", 11, 14, "int", None),
+    ),
+    "Endmdl": (
+        ("endmdl", 2, 6, "str", None),
+    ),
+    "Siguij": (
+        ("siguij", 1, 6, "str", None),
+        ("serial", 7, 11, "int", None),
+        ("name", 13, 16, "str", None),
+        ("altloc", 17, 17, "str", None),
+        ("resname", 18, 20, "str", None),
+        ("chainid", 22, 22, "str", None),
+        ("resseq", 23, 26, "int", None),
+        ("icode", 27, 27, "str", None),
+        ("sig11", 29, 35, "int", None),
+        ("sig22", 36, 42, "int", None),
+        ("sig33", 43, 49, "int", None),
+        ("sig12", 50, 56, "int", None),
+        ("sig13", 57, 63, "int", None),
+        ("sig23", 64, 70, "int", None),
+        ("element", 77, 78, "str", None),
+        ("charge", 79, 80, "str", None),
+    ),
+    "Sigatm": (
+        ("sigatm", 1, 6, "str", None),
+        ("serial", 7, 11, "int", None),
+        ("name", 13, 16, "str", None),
+        ("altloc", 17, 17, "str", None),
+        ("resname", 18, 20, "str", None),
+        ("chainid", 22, 22, "str", None),
+        ("resseq", 23, 26, "int", None),
+        ("icode", 27, 27, "str", None),
+        ("sigx", 31, 38, "float", 3),
+        ("sigy", 39, 46, "float", 3),
+        ("sigz", 47, 54, "float", 3),
+        ("sigocc", 55, 60, "float", 2),
+        ("sigtemp", 61, 66, "float", 2),
+        ("element", 77, 78, "str", None),
+        ("charge", 79, 80, "str", None),
+    ),
+    "Modres": (
+        ("modres", 1, 6, "str", None),
+        ("idcode", 8, 11, "str", None),
+        ("resname", 13, 15, "str", None),
+        ("chainid", 17, 17, "str", None),
+        ("seqnum", 19, 22, "int", None),
+        ("icode", 23, 23, "str", None),
+        ("stdres", 25, 27, "str", None),
+        ("comment", 30, 70, "str", None),
+    ),
+    "Seqres": (
+        ("seqres", 1, 6, "str", None),
+        ("sernum", 9, 10, "int", None),
+        ("chainid", 12, 12, "str", None),
+        ("numres", 14, 17, "int", None),
+        ("resname", 20, 22, "str", None),
+        ("resname1", 24, 26, "str", None),
+        ("resname2", 28, 30, "str", None),
+        ("resname3", 32, 34, "str", None),
+        ("resname4", 36, 38, "str", None),
+        ("resname5", 40, 42, "str", None),
+        ("resname6", 44, 46, "str", None),
+        ("resname7", 48, 50, "str", None),
+        ("resname8", 52, 54, "str", None),
+        ("resname9", 56, 58, "str", None),
+        ("resname10", 60, 62, "str", None),
+        ("resname11", 64, 66, "str", None),
+        ("resname12", 68, 70, "str", None),
+    ),
+    "Seqadv": (
+        ("seqadv", 1, 6, "str", None),
+        ("idcode", 8, 11, "str", None),
+        ("resname", 13, 15, "str", None),
+        ("chainid", 17, 17, "str", None),
+        ("seqnum", 19, 22, "int", None),
+        ("icode", 23, 23, "str", None),
+        ("database", 25, 28, "str", None),
+        ("dbidcode", 30, 38, "str", None),
+        ("dbres", 40, 42, "str", None),
+        ("dbseq", 44, 48, "int", None),
+        ("conflict", 50, 70, "str", None),
+    ),
+    "Dbref": (
+        ("dbref", 1, 6, "str", None),
+        ("idcode", 8, 11, "str", None),
+        ("chainid", 13, 13, "str", None),
+        ("seqbegin", 15, 18, "int", None),
+        ("insertbegin", 19, 19, "str", None),
+        ("seqend", 21, 24, "int", None),
+        ("insertend", 25, 25, "str", None),
+        ("database", 27, 32, "str", None),
+        ("dbaccession", 34, 41, "str", None),
+        ("dbidcode", 43, 54, "str", None),
+        ("dbseqbegin", 56, 60, "int", None),
+        ("idbnsbeg", 61, 61, "str", None),
+        ("dbseqend", 63, 67, "int", None),
+        ("dbinsend", 68, 68, "str", None),
+    ),
+    "Conect": (
+        ("conect", 1, 6, "str", None),
+        ("serial", 7, 11, "int", None),
+        ("serial1", 12, 16, "int", None),
+        ("serial2", 17, 21, "int", None),
+        ("serial3", 22, 26, "int", None),
+        ("serial4", 27, 31, "int", None),
+    ),
+    "Cryst1": (
+        ("cryst1", 1, 6, "str", None),
+        ("a", 7, 15, "float", 3),
+        ("b", 16, 24, "float", 3),
+        ("c", 25, 33, "float", 3),
+        ("alpha", 34, 40, "float", 2),
+        ("beta", 41, 47, "float", 2),
+        ("gamma", 48, 54, "float", 2),
+        ("sgroup", 56, 66, "str", None),
+        ("z", 67, 70, "int", None),
+    ),
+    "Tvect": (
+        ("tvect", 1, 6, "str", None),
+        ("serial", 8, 10, "int", None),
+        ("t1", 11, 20, "float", 5),
+        ("t2", 21, 30, "float", 5),
+        ("t3", 31, 40, "float", 5),
+        ("text", 41, 70, "str", None),
+    ),
+    "Helix": (
+        ("helix", 1, 6, "str", None),
+        ("sernum", 8, 10, "int", None),
+        ("helixid", 12, 14, "str", None),
+        ("initresname", 16, 18, "str", None),
+        ("initchainid", 20, 20, "str", None),
+        ("initseqnum", 22, 25, "int", None),
+        ("initicode", 26, 26, "str", None),
+        ("endresname", 28, 30, "str", None),
+        ("endchainid", 32, 32, "str", None),
+        ("endseqnum", 34, 37, "int", None),
+        ("endicode", 38, 38, "str", None),
+        ("helixclass", 39, 40, "int", None),
+        ("comment", 41, 70, "str", None),
+        ("length", 72, 76, "int", None),
+    ),
+    "Sheet": (
+        ("sheet", 1, 6, "str", None),
+        ("strand", 8, 10, "int", None),
+        ("sheetid", 12, 14, "str", None),
+        ("numstrands", 15, 16, "int", None),
+        ("initresname", 18, 20, "str", None),
+        ("initchainid", 22, 22, "str", None),
+        ("initseqnum", 23, 26, "int", None),
+        ("initicode", 27, 27, "str", None),
+        ("endresname", 29, 31, "str", None),
+        ("endchainid", 33, 33, "str", None),
+        ("endseqnum", 34, 37, "int", None),
+        ("endicode", 38, 38, "str", None),
+        ("sense", 39, 40, "int", None),
+        ("curatom", 42, 45, "str", None),
+        ("curresname", 46, 48, "str", None),
+        ("curchainid", 50, 50, "str", None),
+        ("curresseq", 51, 54, "int", None),
+        ("curicode", 55, 55, "str", None),
+        ("prevatom", 57, 60, "str", None),
+        ("prevresname", 61, 63, "str", None),
+        ("prevchainid", 65, 65, "str", None),
+        ("prevresseq", 66, 69, "int", None),
+        ("previcode", 70, 70, "str", None),
+    ),
+}
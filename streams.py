@@ -0,0 +1,208 @@
+"""Binary, compressed and background-thread input sources for PDBReader.
+
+PDBReader reads plain files itself; this module opens everything else. Paths and
+binary streams are checked for gzip, bz2 and xz magic bytes and decompressed while
+they are read. Reading can also be moved to a background thread that feeds a bounded
+queue, so decompression overlaps with parsing, and `iterate_in_thread` lets asyncio
+code consume a blocking iterator without blocking its event loop.
+"""
+
+import bz2
+import collections
+import gzip
+import lzma
+import queue
+import threading
+
+MAGIC = {b"\x1f\x8b": "gzip", b"BZh": "bz2", b"\xfd7zXZ\x00": "xz"}
+OPENERS = {"gzip": gzip.open, "bz2": bz2.open, "xz": lzma.open}
+
+# Marks the end of the items of a background reader.
+_END = object()
+
+
+def detect_compression(head):
+    """Returns the compression of data starting with the bytes head, or None."""
+    for magic, compression in MAGIC.items():
+        if head.startswith(magic):
+            return compression
+    return None
+
+
+def _stream_head(stream):
+    if hasattr(stream, "peek"):
+        return stream.peek(6)[:6]
+    if stream.seekable():
+        position = stream.tell()
+        head = stream.read(6)
+        stream.seek(position)
+        return head
+    return b""  # Can't look ahead, so the stream is read as it is.
+
+
+def is_stream(source):
+    return hasattr(source, "read")
+
+
+def compression_of(source):
+    """Returns the compression of a path or binary stream, detected by magic bytes."""
+    if is_stream(source):
+        return detect_compression(_stream_head(source))
+    with open(source, "rb") as f:
+        return detect_compression(f.read(6))
+
+
+def open_binary(source, compression="auto"):
+    """Opens a path or binary stream for reading decompressed bytes.
+
+    Args:
+      source: Path, or a binary stream that is read from its current position.
+      compression: "gzip", "bz2", "xz", None for uncompressed data, or "auto" to
+        detect it from the magic bytes.
+
+    Returns:
+      A binary file object. For uncompressed streams it is source itself.
+    """
+    if compression == "auto":
+        compression = compression_of(source)
+    if compression is None:
+        return source if is_stream(source) else open(source, "rb")
+    return OPENERS[compression](source, "rb")
+
+
+class BackgroundLines:
+    """Iterates over the lines of a binary stream read in a background thread.
+
+    The thread reads batches of lines into a queue of at most `max_batches`
+    batches, so memory stays bounded however far the reader is ahead.
+    """
+
+    def __init__(self, stream, batch_size=1024, max_batches=16):
+        self._queue = queue.Queue(max_batches)
+        self._stop = threading.Event()
+        self._lines = iter(())
+        self._finished = False
+        self._thread = threading.Thread(
+            target=self._read, args=(stream, batch_size), daemon=True
+        )
+        self._thread.start()
+
+    def _put(self, item):
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _read(self, stream, batch_size):
+        item = _END
+        try:
+            batch = []
+            for line in stream:
+                batch.append(line)
+                if len(batch) == batch_size:
+                    if not self._put(batch):
+                        return
+                    batch = []
+            if batch and not self._put(batch):
+                return
+        except Exception as e:
+            item = e
+        self._put(item)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        for line in self._lines:
+            return line
+        if self._finished:
+            raise StopIteration
+
+        item = self._queue.get()
+        if item is _END or isinstance(item, Exception):
+            self._finished = True
+            if item is _END:
+                raise StopIteration
+            raise item
+        self._lines = iter(item)
+        return next(self._lines)
+
+    def close(self):
+        """Stops the thread. The stream can be used again once this returns."""
+        self._stop.set()
+        self._thread.join()
+
+
+async def iterate_in_thread(make_iterator, batch_size=256, max_batches=16):
+    """Runs a blocking iterator in a thread and yields its items to asyncio code.
+
+    Items are handed over in batches through a buffer of at most `max_batches`
+    batches, so the thread pauses when the consumer falls behind. Exceptions raised
+    by the iterator are re-raised in the consumer.
+
+    Args:
+      make_iterator: Function that returns the iterator. It is called in the thread.
+      batch_size: Number of items handed over at a time.
+      max_batches: Number of batches buffered before the thread waits.
+    """
+    import asyncio
+
+    loop = asyncio.get_running_loop()
+    ready = asyncio.Event()
+    condition = threading.Condition()
+    batches = collections.deque()
+    stopped = False
+
+    def hand_over(item):
+        nonlocal stopped
+        with condition:
+            while len(batches) >= max_batches and not stopped:
+                condition.wait()
+            if stopped:
+                return False
+            batches.append(item)
+        try:
+            loop.call_soon_threadsafe(ready.set)
+        except RuntimeError:  # The event loop is closed.
+            stopped = True
+        return not stopped
+
+    def produce():
+        try:
+            batch = []
+            for item in make_iterator():
+                batch.append(item)
+                if len(batch) == batch_size:
+                    if not hand_over(batch):
+                        return
+                    batch = []
+            if batch and not hand_over(batch):
+                return
+            hand_over(_END)
+        except Exception as e:
+            hand_over(e)
+
+    thread = threading.Thread(target=produce, daemon=True)
+    thread.start()
+    try:
+        while True:
+            await ready.wait()
+            with condition:
+                items = list(batches)
+                batches.clear()
+                ready.clear()
+                condition.notify()
+            for item in items:
+                if item is _END:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                for value in item:
+                    yield value
+    finally:
+        with condition:
+            stopped = True
+            condition.notify()
@@ -0,0 +1,138 @@
+import asyncio
+import bz2
+import gzip
+import io
+import lzma
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+import streams
+from pdb_reader import PDBReader
+
+EXAMPLE_PDB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "1.pdb")
+
+
+class Unseekable(io.RawIOBase):
+    """A binary stream that can only be read forward, like a socket."""
+
+    def __init__(self, data):
+        self.data = io.BytesIO(data)
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        chunk = self.data.read(len(buffer))
+        buffer[: len(chunk)] = chunk
+        return len(chunk)
+
+
+class TestCompressedInputs(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        with open(EXAMPLE_PDB, "rb") as f:
+            self.data = f.read()
+        with PDBReader(EXAMPLE_PDB) as pdb:
+            self.expected = list(pdb)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_compressed_files(self):
+        for name, module in (("1.pdb.gz", gzip), ("1.pdb.bz2", bz2), ("1.ent.xz", lzma)):
+            path = os.path.join(self.tmp, name)
+            with open(path, "wb") as f:
+                f.write(module.compress(self.data))
+
+            with PDBReader(path, use_mmap=True) as pdb:
+                self.assertEqual(list(pdb), self.expected, name)
+                pdb.reset()
+                self.assertEqual(next(pdb), self.expected[0], name)
+
+    def test_detect_compression(self):
+        self.assertEqual(streams.detect_compression(gzip.compress(b"x")), "gzip")
+        self.assertEqual(streams.detect_compression(lzma.compress(b"x")), "xz")
+        self.assertIsNone(streams.detect_compression(self.data))
+
+    def test_binary_streams(self):
+        stream = io.BytesIO(gzip.compress(self.data))
+        with PDBReader(stream) as pdb:
+            self.assertEqual(list(pdb), self.expected)
+            pdb.reset()
+            self.assertEqual(list(pdb), self.expected)
+        self.assertFalse(stream.closed)
+
+        with PDBReader(io.BufferedReader(Unseekable(self.data))) as pdb:
+            self.assertEqual(list(pdb), self.expected)
+
+    def test_threaded(self):
+        path = os.path.join(self.tmp, "1.pdb.gz")
+        with open(path, "wb") as f:
+            f.write(gzip.compress(self.data * 50))
+
+        with PDBReader(path, threaded=True) as pdb:
+            self.assertEqual(next(pdb), self.expected[0])
+            pdb.reset()
+            self.assertEqual(list(pdb), self.expected * 50)
+
+    def test_background_lines_error(self):
+        def failing():
+            yield from (b"ATOM\n", b"ATOM\n", b"ATOM\n")
+            raise OSError("truncated stream")
+
+        lines = streams.BackgroundLines(failing(), batch_size=2)
+        self.assertEqual([next(lines), next(lines)], [b"ATOM\n"] * 2)
+        with self.assertRaises(OSError):
+            list(lines)
+        self.assertEqual(list(lines), [])
+
+
+class TestImports(unittest.TestCase):
+    def test_asyncio_imported_on_use(self):
+        code = "import sys, pdb_reader; print('asyncio' in sys.modules)"
+        output = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        self.assertEqual(output.strip(), "False")
+
+
+class TestAsyncIteration(unittest.IsolatedAsyncioTestCase):
+    async def test_async_for(self):
+        with PDBReader(EXAMPLE_PDB) as pdb:
+            expected = list(pdb)
+
+        async def parse(data):
+            with PDBReader(io.BytesIO(gzip.compress(data))) as pdb:
+                return [record async for record in pdb]
+
+        with open(EXAMPLE_PDB, "rb") as f:
+            data = f.read()
+        results = await asyncio.gather(*(parse(data) for _ in range(4)))
+        self.assertEqual(results, [expected] * 4)
+
+    async def test_bounded_and_stoppable(self):
+        items = streams.iterate_in_thread(
+            lambda: iter(range(10**6)), batch_size=10, max_batches=2
+        )
+        self.assertEqual([await anext(items) for _ in range(25)], list(range(25)))
+        await items.aclose()
+
+    async def test_errors_propagate(self):
+        def failing():
+            yield 1
+            raise ValueError("bad line")
+
+        with self.assertRaises(ValueError):
+            [i async for i in streams.iterate_in_thread(failing)]
+
+
+if __name__ == "__main__":
+    unittest.main()
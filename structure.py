@@ -0,0 +1,222 @@
+"""Models, chains and residues of a PDB file as index ranges over atom arrays.
+
+A Structure keeps one set of column arrays for all ATOM and HETATM records, like
+`PDBReader.to_arrays`, and describes the hierarchy with arrays of start offsets:
+the atoms of residue i are rows `residue_starts[i]:residue_starts[i + 1]`. There
+are no per-atom or per-residue Python objects, so memory stays close to that of the
+arrays however large the structure.
+
+    with PDBReader("1.pdb") as pdb:
+        structure = pdb.to_structure()
+    atoms = structure.atoms_in(structure.residue("", 18))
+    print(atoms["name"], atoms["coordinates"])
+"""
+
+import numpy as np
+
+import columnar
+import record_reader
+
+# Record types of the atoms of a structure.
+ATOM_RECORDS = ("Atom", "Hetatm")
+
+# Fields that identify a residue within a chain.
+RESIDUE_FIELDS = ("resseq", "icode", "resname")
+
+# Fields read from their full PDB columns, see `record_reader.FieldReader.exact_columns`.
+EXACT_FIELDS = ("chainid", *RESIDUE_FIELDS)
+
+
+def _changes(column):
+    """Returns the rows where column differs from the row before."""
+    return np.flatnonzero(column[1:] != column[:-1]) + 1
+
+
+def _starts(breaks, count):
+    """Returns sorted, unique group starts from breaks, closed with count."""
+    breaks = np.asarray(breaks, np.int64)
+    starts = np.unique(np.concatenate([[0], breaks[breaks < count]]))
+    return np.append(starts, count) if count else np.zeros(1, np.int64)
+
+
+class Structure:
+    """The atoms of a PDB file grouped into models, chains and residues.
+
+    A model starts at each MODEL record; files without MODEL records have a single
+    model with serial 0. As in `model_index.ModelIndex`, a chain starts at the
+    beginning of a model, after a TER record, or where the chain ID changes. A
+    residue starts with a chain or where the residue number, insertion code or
+    residue name changes. The chain and residue fields are read from their full PDB
+    columns, e.g. the chain ID from column 22, so they can differ from the fields
+    of parsed records.
+
+    Attributes:
+      atoms: Dict of field name to array with one row per atom, plus a "record"
+        column with "Atom" or "Hetatm".
+      coordinates: (N, 3) array of the atom coordinates. atoms["x"], ["y"] and ["z"]
+        are views of its columns.
+      model_serials: Serial number of each model.
+      model_starts, chain_starts, residue_starts: Atom offsets of each model, chain
+        and residue, followed by the number of atoms.
+      chain_models: Index of the model of each chain.
+      residue_chains: Index of the chain of each residue.
+    """
+
+    def __init__(self, atoms, model_serials, model_starts, chain_starts, residue_starts):
+        self.atoms = dict(atoms)
+        self.coordinates = np.column_stack([atoms["x"], atoms["y"], atoms["z"]])
+        for axis, name in enumerate("xyz"):
+            self.atoms[name] = self.coordinates[:, axis]
+        self.model_serials = np.asarray(model_serials, np.int64)
+        self.model_starts = model_starts
+        self.chain_starts = chain_starts
+        self.residue_starts = residue_starts
+        self.chain_models = self._parents(chain_starts, model_starts)
+        self.residue_chains = self._parents(residue_starts, chain_starts)
+        self._chains = None
+        self._residues = None
+
+    @staticmethod
+    def _parents(starts, parent_starts):
+        return np.searchsorted(parent_starts, starts[:-1], side="right") - 1
+
+    @classmethod
+    def build(cls, lines, fields=None, chunk_size=columnar.DEFAULT_CHUNK_SIZE):
+        """Builds a structure from PDB lines in a single pass.
+
+        Args:
+          lines: Iterable of PDB lines, as str or bytes.
+          fields: Names of the atom fields to load. Defaults to all fields; the
+            coordinates and the chain and residue fields are always loaded.
+          chunk_size: Number of lines converted at a time.
+        """
+        readers = record_reader.Readers
+        model, ter = readers["Model"], readers["Ter"]
+        atom_readers = [readers[key] for key in ATOM_RECORDS]
+        if fields is not None:
+            required = ("x", "y", "z", "chainid", *RESIDUE_FIELDS)
+            fields = list(dict.fromkeys([*required, *fields]))
+        shared = columnar.shared_fields(atom_readers, fields)
+        builder = columnar.ColumnBuilder(
+            [f.exact_columns() if f.name in EXACT_FIELDS else f for f in shared],
+            chunk_size,
+        )
+        model_serial = next(f for f in model.fields if f.name == "serial").exact_columns()
+        index = record_reader.RecordIndex([model, ter, *atom_readers])
+
+        model_serials, model_starts, ter_starts = [], [], []
+        names, chunk = [], []
+        count = 0
+        for line in lines:
+            reader = index.reader_for(line)
+            if reader is None:
+                continue
+            if isinstance(line, bytes):
+                line = line.decode()
+            if reader is model:
+                model_serials.append(model_serial.read(line))
+                model_starts.append(count)
+            elif reader is ter:
+                ter_starts.append(count)
+            else:
+                names.append(reader.name)
+                chunk.append(line)
+                count += 1
+                if len(chunk) == chunk_size:
+                    builder.add(names, chunk)
+                    names, chunk = [], []
+        if chunk:
+            builder.add(names, chunk)
+        atoms = builder.arrays()
+
+        if not model_serials:
+            model_serials, model_starts = [0], [0]
+        model_starts = np.append(np.asarray(model_starts, np.int64), count)
+        chain_starts = _starts(
+            np.concatenate([model_starts, ter_starts, _changes(atoms["chainid"])]), count
+        )
+        residue_breaks = [chain_starts] + [_changes(atoms[f]) for f in RESIDUE_FIELDS]
+        residue_starts = _starts(np.concatenate(residue_breaks), count)
+        return cls(atoms, model_serials, model_starts, chain_starts, residue_starts)
+
+    def __len__(self):
+        return len(self.coordinates)
+
+    @property
+    def chain_ids(self):
+        """Chain ID of each chain."""
+        return self.atoms["chainid"][self.chain_starts[:-1]]
+
+    def residue_info(self, fields=RESIDUE_FIELDS):
+        """Returns a dict of arrays of fields of the first atom of each residue."""
+        starts = self.residue_starts[:-1]
+        return {name: self.atoms[name][starts] for name in fields}
+
+    def model(self, serial=None):
+        """Returns the slice of the atoms of the model with serial, or the first one.
+
+        Raises:
+          KeyError: If there is no such model.
+        """
+        i = self._model_index(serial)
+        return slice(int(self.model_starts[i]), int(self.model_starts[i + 1]))
+
+    def _model_index(self, model):
+        if model is None:
+            return 0
+        found = np.flatnonzero(self.model_serials == model)
+        if not len(found):
+            raise KeyError(model)
+        return found[0]
+
+    def chain(self, chain_id, model=None):
+        """Returns the slice of the atoms of the first chain with chain_id.
+
+        Args:
+          chain_id: Chain ID, from column 22.
+          model: Model serial, or None for the first model.
+
+        Raises:
+          KeyError: If there is no such chain.
+        """
+        if self._chains is None:
+            keys = zip(self.chain_models.tolist(), self.chain_ids.tolist())
+            self._chains = {}
+            for i, key in enumerate(keys):
+                self._chains.setdefault(key, i)
+        i = self._chains[(self._model_index(model), chain_id)]
+        return slice(int(self.chain_starts[i]), int(self.chain_starts[i + 1]))
+
+    def residue(self, chain_id, resseq, icode="", model=None):
+        """Returns the slice of the atoms of a residue.
+
+        Residues are looked up by a dict that is built on first use, so each later
+        lookup is a dict access.
+
+        Raises:
+          KeyError: If there is no such residue.
+        """
+        if self._residues is None:
+            info = self.residue_info(("resseq", "icode"))
+            chains = self.residue_chains
+            keys = zip(
+                self.chain_models[chains].tolist(),
+                self.chain_ids[chains].tolist(),
+                info["resseq"].tolist(),
+                info["icode"].tolist(),
+            )
+            self._residues = {}
+            for i, key in enumerate(keys):
+                self._residues.setdefault(key, i)
+        i = self._residues[(self._model_index(model), chain_id, resseq, icode)]
+        return slice(int(self.residue_starts[i]), int(self.residue_starts[i + 1]))
+
+    def residue_of(self, atoms):
+        """Returns the residue index of each of the given atom indices."""
+        return np.searchsorted(self.residue_starts, atoms, side="right") - 1
+
+    def atoms_in(self, rows):
+        """Returns views of the atom columns, and the coordinates, of rows."""
+        columns = {name: column[rows] for name, column in self.atoms.items()}
+        columns["coordinates"] = self.coordinates[rows]
+        return columns
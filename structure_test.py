@@ -0,0 +1,120 @@
+import io
+import os
+import unittest
+
+import numpy as np
+
+import benchmark
+from filters import RecordFilter
+from pdb_reader import PDBReader
+from structure import Structure
+
+EXAMPLE_PDB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "1.pdb")
+
+
+def group_records(records):
+    """Groups records into [[[atom, ...] per residue] per chain] per model."""
+    models, chain, residue = [], None, None
+    for record in records:
+        kind = type(record).__name__
+        if kind == "Model" or not models:
+            models.append([])
+            chain = None
+        if kind == "Ter":
+            chain = None
+        if kind not in ("Atom", "Hetatm"):
+            continue
+        if chain is None or record.chainid != chain[-1][-1].chainid:
+            chain = []
+            models[-1].append(chain)
+            residue = None
+        key = (record.resseq, record.icode, record.resname)
+        if residue is None or key != residue_key:
+            residue, residue_key = [], key
+            chain.append(residue)
+        residue.append(record)
+    return models
+
+
+class TestStructure(unittest.TestCase):
+    def setUp(self):
+        with PDBReader(EXAMPLE_PDB) as pdb:
+            self.structure = pdb.to_structure()
+
+    def test_hierarchy(self):
+        s = self.structure
+        self.assertEqual(s.model_serials.tolist(), [1, 2])
+        self.assertEqual(s.model_starts.tolist(), [0, 5, 9])
+        # The HETATM of model 1 is in chain P.
+        self.assertEqual(s.chain_starts.tolist(), [0, 4, 5, 9])
+        self.assertEqual(s.chain_ids.tolist(), ["", "P", ""])
+        self.assertEqual(s.residue_starts.tolist(), [0, 2, 4, 5, 7, 9])
+        self.assertEqual(s.residue_chains.tolist(), [0, 0, 1, 2, 2])
+        self.assertEqual(s.chain_models.tolist(), [0, 0, 1])
+        self.assertEqual(s.residue_info()["resseq"].tolist(), [1, 18, 1, 1, 18])
+
+    def test_lookups(self):
+        s = self.structure
+        self.assertEqual(s.model(2), slice(5, 9))
+        self.assertEqual(s.chain("", model=2), slice(5, 9))
+        self.assertEqual(s.residue("", 18, model=2), slice(7, 9))
+        atoms = s.atoms_in(s.residue("", 18))
+        self.assertEqual(atoms["serial"].tolist(), [293, 294])
+        np.testing.assert_array_equal(atoms["coordinates"][:, 0], atoms["x"])
+        self.assertEqual(s.residue_of([0, 4, 8]).tolist(), [0, 2, 4])
+        with self.assertRaises(KeyError):
+            s.residue("", 99)
+        with self.assertRaises(KeyError):
+            s.model(3)
+
+    def test_named_chains(self):
+        lines = [
+            "ATOM      1  N   ALA A   1      11.104   6.134  -6.504  1.00  0.00           N\n",
+            "ATOM      2  CA  ALA A   1      11.639   6.071  -5.147  1.00  0.00           C\n",
+            "ATOM      3  N   GLY A1000      12.104   7.134  -6.504  1.00  0.00           N\n",
+            "ATOM      4  N   ALA B   1      13.104   8.134  -6.504  1.00  0.00           N\n",
+            "ATOM      5  CA  ALA B   1      13.639   8.071  -5.147  1.00  0.00           C\n",
+        ]
+        s = Structure.build(lines)
+        self.assertEqual(s.chain_ids.tolist(), ["A", "B"])
+        self.assertEqual(s.chain("A"), slice(0, 3))
+        self.assertEqual(s.chain("B"), slice(3, 5))
+        self.assertEqual(s.residue("A", 1000), slice(2, 3))
+        self.assertEqual(s.residue("B", 1), slice(3, 5))
+        with self.assertRaises(KeyError):
+            s.chain("")
+
+    def test_same_groups_as_records(self):
+        lines = list(benchmark.generate("models", 5000, seed=3))
+        structure = Structure.build(lines, chunk_size=1000)
+        with PDBReader(io.BytesIO("".join(lines).encode())) as pdb:
+            models = group_records(pdb)
+
+        residues = [r for model in models for chain in model for r in chain]
+        self.assertEqual(len(structure.model_serials), len(models))
+        self.assertEqual(len(structure.chain_starts) - 1, sum(map(len, models)))
+        self.assertEqual(np.diff(structure.residue_starts).tolist(), list(map(len, residues)))
+
+    def test_filters_select_atoms(self):
+        with PDBReader(EXAMPLE_PDB, filters=RecordFilter(models=[2])) as pdb:
+            structure = pdb.to_structure(fields=["name"])
+        self.assertEqual(len(structure), 4)
+        self.assertEqual(structure.model(1), slice(0, 0))
+        self.assertEqual(structure.atoms_in(structure.model(2))["name"][0], "N")
+
+    def test_record_type_filter(self):
+        with PDBReader(EXAMPLE_PDB, filters=RecordFilter(record_types=["Atom"])) as pdb:
+            structure = pdb.to_structure()
+        self.assertEqual(len(structure), 8)
+        self.assertEqual(structure.model_serials.tolist(), [1, 2])
+        self.assertEqual(structure.model(2), slice(4, 8))
+        self.assertEqual(structure.chain_ids.tolist(), ["", ""])
+
+    def test_empty(self):
+        structure = Structure.build(["END\n"])
+        self.assertEqual(len(structure), 0)
+        self.assertEqual(len(structure.residue_starts), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
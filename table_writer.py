@@ -0,0 +1,233 @@
+"""Streaming writers of column arrays to CSV, NumPy .npz, Parquet and Arrow files.
+
+A table writer takes batches of columns, such as the arrays of
+`PDBReader.to_arrays`, and writes each batch as it comes, so a table can be built
+from many files without holding all of its rows in memory:
+
+    with table_writer.open_table("atoms.npz") as table:
+        for path in paths:
+            with PDBReader(path) as pdb:
+                table.write(pdb.to_arrays())
+
+Every batch must have the columns of the first one. Parquet and Arrow files
+require pyarrow.
+"""
+
+import csv
+import os
+import shutil
+import tempfile
+import zipfile
+
+import numpy as np
+
+
+class TableWriter:
+    """Base class of the table writers.
+
+    Attributes:
+      path: Path of the file written.
+      columns: Column names, in order, set by the first batch.
+      rows: Number of rows written so far.
+    """
+
+    suffix = None
+
+    def __init__(self, path):
+        self.path = path
+        self.columns = None
+        self.rows = 0
+
+    def write(self, arrays):
+        """Appends a batch of rows, given as a dict of column name to array.
+
+        Raises:
+          ValueError: If the batch has different columns than the first one, or
+            columns of different lengths.
+        """
+        arrays = {name: np.asarray(column) for name, column in arrays.items()}
+        if self.columns is None:
+            self.columns = list(arrays)
+            self._start(arrays)
+        elif list(arrays) != self.columns:
+            raise ValueError(
+                f"{self.path}: expected columns {self.columns}, got {list(arrays)}."
+            )
+        lengths = {len(column) for column in arrays.values()}
+        if len(lengths) > 1:
+            raise ValueError(f"{self.path}: columns have different lengths {lengths}.")
+        count = lengths.pop() if lengths else 0
+        if count:
+            self._write(arrays)
+            self.rows += count
+
+    def _start(self, arrays):
+        pass
+
+    def _write(self, arrays):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.close()
+        return False
+
+
+class CSVTableWriter(TableWriter):
+    """Writes a CSV file with a header row of the column names."""
+
+    suffix = ".csv"
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.f = open(path, "w", newline="")
+        self.writer = csv.writer(self.f)
+
+    def _start(self, arrays):
+        self.writer.writerow(self.columns)
+
+    def _write(self, arrays):
+        self.writer.writerows(zip(*(arrays[name].tolist() for name in self.columns)))
+
+    def close(self):
+        if self.f is not None:
+            self.f.close()
+            self.f = None
+
+
+class NPZTableWriter(TableWriter):
+    """Writes a NumPy .npz file with one array per column, as `np.savez` does.
+
+    An .npz file can't be appended to, so each column is written to a temporary
+    file next to path while batches arrive, and the columns are copied into the
+    .npz file when the writer is closed. Batches are cast to the dtypes of the first
+    batch; string columns therefore have the width of the first batch's strings.
+
+    Raises:
+      ValueError: From write, if a column can't be cast safely to the dtype of the
+        first batch, e.g. longer strings than before.
+    """
+
+    suffix = ".npz"
+
+    def __init__(self, path, compress=False):
+        super().__init__(path)
+        self.compress = compress
+        self.dtypes = None
+        self._directory = tempfile.mkdtemp(dir=os.path.dirname(os.path.abspath(path)))
+        self._files = {}
+
+    def _start(self, arrays):
+        self.dtypes = {name: column.dtype for name, column in arrays.items()}
+        for i, name in enumerate(self.columns):
+            self._files[name] = open(os.path.join(self._directory, f"{i}.bin"), "w+b")
+
+    def _write(self, arrays):
+        for name, column in arrays.items():
+            dtype = self.dtypes[name]
+            if not np.can_cast(column.dtype, dtype, "safe"):
+                raise ValueError(
+                    f"{self.path}: column {name} of {column.dtype} doesn't fit {dtype}."
+                )
+            self._files[name].write(np.ascontiguousarray(column, dtype).tobytes())
+
+    def close(self):
+        if self._directory is None:
+            return
+        try:
+            compression = zipfile.ZIP_DEFLATED if self.compress else zipfile.ZIP_STORED
+            with zipfile.ZipFile(self.path, "w", compression, allowZip64=True) as npz:
+                for name, f in self._files.items():
+                    header = {
+                        "descr": np.lib.format.dtype_to_descr(self.dtypes[name]),
+                        "fortran_order": False,
+                        "shape": (self.rows,),
+                    }
+                    with npz.open(f"{name}.npy", "w", force_zip64=True) as member:
+                        np.lib.format.write_array_header_1_0(member, header)
+                        f.seek(0)
+                        shutil.copyfileobj(f, member)
+        finally:
+            for f in self._files.values():
+                f.close()
+            shutil.rmtree(self._directory)
+            self._directory = None
+
+
+class ParquetTableWriter(TableWriter):
+    """Writes a Parquet file with a row group per batch. Requires pyarrow."""
+
+    suffix = ".parquet"
+
+    def __init__(self, path):
+        import pyarrow
+
+        super().__init__(path)
+        self._pyarrow = pyarrow
+        self.schema = None
+        self.writer = None
+
+    def _open_writer(self):
+        import pyarrow.parquet
+
+        return pyarrow.parquet.ParquetWriter(self.path, self.schema)
+
+    def _start(self, arrays):
+        self.schema = self._pyarrow.table(arrays).schema
+        self.writer = self._open_writer()
+
+    def _write(self, arrays):
+        self.writer.write_table(self._pyarrow.table(arrays, schema=self.schema))
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+
+class ArrowTableWriter(ParquetTableWriter):
+    """Writes an Arrow IPC file with a record batch per batch. Requires pyarrow."""
+
+    suffix = ".arrow"
+
+    def _open_writer(self):
+        import pyarrow.ipc
+
+        return pyarrow.ipc.new_file(self.path, self.schema)
+
+
+# Table writers by format name.
+FORMATS = {
+    "csv": CSVTableWriter,
+    "npz": NPZTableWriter,
+    "parquet": ParquetTableWriter,
+    "arrow": ArrowTableWriter,
+}
+
+
+def available_formats():
+    """Returns the names of the formats whose dependencies are installed."""
+    try:
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return ["csv", "npz"]
+    return list(FORMATS)
+
+
+def open_table(path, format=None):
+    """Returns a table writer for path, with the format of its suffix by default.
+
+    Raises:
+      ValueError: If the format isn't given and the suffix is unknown.
+    """
+    if format is None:
+        by_suffix = {cls.suffix: name for name, cls in FORMATS.items()}
+        format = by_suffix.get(os.path.splitext(path)[1])
+        if format is None:
+            raise ValueError(f"Unknown table format of {path}.")
+    return FORMATS[format](path)
@@ -0,0 +1,89 @@
+import csv
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+import table_writer
+from pdb_reader import PDBReader
+
+EXAMPLE_PDB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "1.pdb")
+
+
+def has_pyarrow():
+    return "parquet" in table_writer.available_formats()
+
+
+class TestTableWriter(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        with PDBReader(EXAMPLE_PDB) as pdb:
+            self.arrays = pdb.to_arrays(fields=["serial", "name", "x"])
+        self.batches = [
+            {name: column[start : start + 3] for name, column in self.arrays.items()}
+            for start in range(0, len(self.arrays["x"]), 3)
+        ]
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, name):
+        path = os.path.join(self.tmp.name, name)
+        with table_writer.open_table(path) as table:
+            for arrays in self.batches:
+                table.write(arrays)
+        self.assertEqual(table.rows, len(self.arrays["x"]))
+        return path
+
+    def test_csv(self):
+        with open(self.write("atoms.csv"), newline="") as f:
+            rows = list(csv.reader(f))
+
+        self.assertEqual(rows[0], list(self.arrays))
+        self.assertEqual(len(rows), len(self.arrays["x"]) + 1)
+        self.assertEqual([float(row[3]) for row in rows[1:]], self.arrays["x"].tolist())
+
+    def test_npz(self):
+        with np.load(self.write("atoms.npz")) as npz:
+            self.assertEqual(list(npz), list(self.arrays))
+            for name, column in self.arrays.items():
+                np.testing.assert_array_equal(npz[name], column)
+        self.assertEqual(os.listdir(self.tmp.name), ["atoms.npz"])
+
+    def test_npz_longer_strings(self):
+        path = os.path.join(self.tmp.name, "names.npz")
+        with table_writer.open_table(path) as table:
+            table.write({"name": np.array(["CA"])})
+            with self.assertRaises(ValueError):
+                table.write({"name": np.array(["CA", "OXT"])})
+
+    def test_different_columns(self):
+        with table_writer.open_table(os.path.join(self.tmp.name, "t.csv")) as table:
+            table.write({"x": [1.0]})
+            with self.assertRaises(ValueError):
+                table.write({"y": [1.0]})
+
+    def test_unknown_suffix(self):
+        with self.assertRaises(ValueError):
+            table_writer.open_table(os.path.join(self.tmp.name, "atoms.txt"))
+
+    @unittest.skipUnless(has_pyarrow(), "requires pyarrow")
+    def test_parquet(self):
+        import pyarrow.parquet
+
+        table = pyarrow.parquet.read_table(self.write("atoms.parquet"))
+        self.assertEqual(table.column_names, list(self.arrays))
+        self.assertEqual(table.column("x").to_pylist(), self.arrays["x"].tolist())
+
+    @unittest.skipUnless(has_pyarrow(), "requires pyarrow")
+    def test_arrow(self):
+        import pyarrow.ipc
+
+        with pyarrow.ipc.open_file(self.write("atoms.arrow")) as reader:
+            table = reader.read_all()
+        self.assertEqual(table.column("name").to_pylist(), self.arrays["name"].tolist())
+
+
+if __name__ == "__main__":
+    unittest.main()